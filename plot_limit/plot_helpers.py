@@ -1,6 +1,24 @@
 import logging
 
-import ROOT
+try:
+    from HEPTools.plot_utils.lazy_root import ROOT
+    from HEPTools.plot_utils.profiling import profiled
+except (ImportError, SyntaxError):
+    # standalone use (e.g. from python 2 scripts), run without profiling
+    import ROOT
+
+    def profiled(phase_name):
+        return lambda func: func
+
+
+TREX_LIMIT_BRANCHES = [
+    "exp_upperlimit",
+    "exp_upperlimit_plus1",
+    "exp_upperlimit_plus2",
+    "exp_upperlimit_minus1",
+    "exp_upperlimit_minus2",
+    "obs_upperlimit",
+]
 
 # atlas_* functions are adapted from ATLASUtil.py
 
@@ -57,6 +75,7 @@ def atlas_draw_text_one_line(
         scaleLineHeight = 0.8
     if skipLines:
         text = "#lower[%.1f]{%s}" % (skipLines * scaleLineHeight, text)
+
     # Draw the text quite simply:
     l = ROOT.TLatex()
     if NDC:
@@ -129,6 +148,7 @@ def parse_str_list(plot_config, section, option):
     return []
 
 
+@profiled("process_input")
 def process_input(plot_config):
     """Checks & gets input numbers"""
     input_dict = {}
@@ -155,16 +175,14 @@ def process_input(plot_config):
         obs_values = []
         for folder in folders:
             path = path_prefix + "/" + folder + "/" + path_suffix
-            limit_file = ROOT.TFile.Open(path, "read")
-            limit_tree = limit_file.Get(tree_name)
-            for event in limit_tree:
-                medium_values.append(event.exp_upperlimit)
-                plus1_values.append(event.exp_upperlimit_plus1)
-                plus2_values.append(event.exp_upperlimit_plus2)
-                minus1_values.append(event.exp_upperlimit_minus1)
-                minus2_values.append(event.exp_upperlimit_minus2)
-                obs_values.append(event.obs_upperlimit)
-                break  # only 1 entry
+            limits = read_trex_limits(path, tree_name)
+            if limits:
+                medium_values.append(limits["exp_upperlimit"])
+                plus1_values.append(limits["exp_upperlimit_plus1"])
+                plus2_values.append(limits["exp_upperlimit_plus2"])
+                minus1_values.append(limits["exp_upperlimit_minus1"])
+                minus2_values.append(limits["exp_upperlimit_minus2"])
+                obs_values.append(limits["obs_upperlimit"])
         process_input_member_trex("upper_limits_medium", medium_values, input_dict)
         process_input_member_trex("upper_limits_plus1", plus1_values, input_dict)
         process_input_member_trex("upper_limits_plus2", plus2_values, input_dict)
@@ -228,3 +246,14 @@ def process_input_member_trex(input_name, input_values, input_dict):
                 )
             )
             exit()
+
+
+@profiled("trex_read")
+def read_trex_limits(path, tree_name):
+    """Returns limits of the first entry in TRexFitter limit tree as dict"""
+    limit_file = ROOT.TFile.Open(path, "read")
+    limit_tree = limit_file.Get(tree_name)
+    for event in limit_tree:
+        # only 1 entry
+        return {name: getattr(event, name) for name in TREX_LIMIT_BRANCHES}
+    return {}
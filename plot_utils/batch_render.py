@@ -0,0 +1,191 @@
+import concurrent.futures
+import multiprocessing
+import os
+import time
+import traceback
+from typing import Callable, List, Union
+
+from HEPTools.plot_utils.lazy_root import ROOT
+
+
+class PlotJob(object):
+    """Plot job for batch rendering.
+
+    A class to describe one plot: how to build the plot object, how to draw it
+    and where to save it.
+
+    Note:
+        build_plot must be picklable (e.g. a module level function). It is
+    called in the worker process and must return an object with draw() and
+    save() methods, like TH1Tool, HistCollection or THStackTool.
+        If incremental is True, the object's render() method is used, so the
+    plot is not drawn and saved again when its fingerprint is unchanged (see
+    render_cache).
+
+    """
+
+    def __init__(
+        self,
+        name: str,
+        build_plot: Callable,
+        args: tuple = (),
+        kwargs: Union[dict, None] = None,
+        draw_kwargs: Union[dict, None] = None,
+        save_dir: str = "plots",
+        save_file_name: Union[str, None] = None,
+        save_format: str = "png",
+        incremental: bool = False,
+    ) -> None:
+        """Inits PlotJob.
+
+        Note:
+            The output path is save_dir/save_file_name.save_format, with
+        save_file_name defaulting to name.
+
+        """
+        self.name = name
+        self.build_plot = build_plot
+        self.args = args
+        self.kwargs = kwargs if kwargs is not None else {}
+        self.draw_kwargs = draw_kwargs if draw_kwargs is not None else {}
+        self.save_dir = os.path.abspath(save_dir)
+        if save_file_name is None:
+            save_file_name = name
+        self.save_file_name = save_file_name
+        self.save_format = save_format
+        self.incremental = incremental
+
+    def get_save_path(self) -> str:
+        """Returns absolute output path of the job."""
+        return os.path.join(
+            self.save_dir, self.save_file_name + "." + self.save_format
+        )
+
+
+class RenderResult(object):
+    """Result of a rendered PlotJob."""
+
+    def __init__(
+        self,
+        name: str,
+        save_path: str,
+        success: bool,
+        elapsed: float,
+        error: Union[str, None] = None,
+        skipped: bool = False,
+    ) -> None:
+        """Inits RenderResult.
+
+        Note:
+            skipped is True if an incremental job found its output up to date.
+
+        """
+        self.name = name
+        self.save_path = save_path
+        self.success = success
+        self.elapsed = elapsed
+        self.error = error
+        self.skipped = skipped
+
+    def __repr__(self) -> str:
+        return (
+            "RenderResult(name={!r}, success={}, skipped={}, elapsed={:.3f}s)".format(
+                self.name, self.success, self.skipped, self.elapsed
+            )
+        )
+
+
+def render_plots(
+    jobs: List[PlotJob], workers: Union[int, None] = None, chunksize: int = 1
+) -> List[RenderResult]:
+    """Renders plot jobs over a process pool.
+
+    Note:
+        Each worker process initialises ROOT once in batch mode. Workers are
+    spawned rather than forked, as forking an initialised ROOT interpreter is
+    not safe. Jobs are sent to the workers in chunks of chunksize jobs.
+    Results are returned in job order, jobs which couldn't be rendered because
+    their worker failed (e.g. the process died) get a failed result. If
+    workers is 1, jobs are rendered in the current process.
+
+    Raises:
+        ValueError: if two jobs write to the same output path.
+
+    """
+    save_paths = [job.get_save_path() for job in jobs]
+    if len(set(save_paths)) != len(save_paths):
+        raise ValueError("Duplicated output paths in plot jobs.")
+    for job in jobs:
+        os.makedirs(job.save_dir, exist_ok=True)
+    if workers == 1:
+        _init_worker()
+        return [_render_job(job) for job in jobs]
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    ) as executor:
+        job_chunks = [
+            jobs[start : start + chunksize] for start in range(0, len(jobs), chunksize)
+        ]
+        futures = [executor.submit(_render_jobs, chunk) for chunk in job_chunks]
+        results = []
+        for job_chunk, future in zip(job_chunks, futures):
+            try:
+                results += future.result()
+            except Exception:
+                error = traceback.format_exc()
+                results += [
+                    RenderResult(job.name, job.get_save_path(), False, 0.0, error)
+                    for job in job_chunk
+                ]
+        return results
+
+
+def _init_worker() -> None:
+    """Initialises ROOT in batch mode for the worker process."""
+    ROOT.gROOT.SetBatch(True)
+
+
+def _render_job(job: PlotJob) -> RenderResult:
+    """Builds, draws and saves one plot job."""
+    start_time = time.perf_counter()
+    skipped = False
+    try:
+        plot = job.build_plot(*job.args, **job.kwargs)
+        if job.incremental:
+            skipped = not plot.render(
+                save_dir=job.save_dir,
+                save_file_name=job.save_file_name,
+                save_format=job.save_format,
+                release_canvas=True,
+                **job.draw_kwargs
+            )
+        else:
+            plot.draw(**job.draw_kwargs)
+            plot.save(
+                save_dir=job.save_dir,
+                save_file_name=job.save_file_name,
+                save_format=job.save_format,
+                release_canvas=True,
+            )
+    except Exception:
+        return RenderResult(
+            job.name,
+            job.get_save_path(),
+            False,
+            time.perf_counter() - start_time,
+            traceback.format_exc(),
+        )
+    return RenderResult(
+        job.name,
+        job.get_save_path(),
+        True,
+        time.perf_counter() - start_time,
+        skipped=skipped,
+    )
+
+
+def _render_jobs(jobs: List[PlotJob]) -> List[RenderResult]:
+    """Renders a chunk of plot jobs, see _render_job."""
+    return [_render_job(job) for job in jobs]
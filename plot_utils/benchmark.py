@@ -0,0 +1,470 @@
+"""
+Benchmarks of th1_tools hot paths on synthetic data.
+
+Usage:
+python -m HEPTools.plot_utils.benchmark [--groups GROUP ...] [--max-entries N]
+    [--max-hists N] [--baseline BASELINE.json] [--tolerance 0.2]
+    [--save-baseline BASELINE.json]
+
+Exits with status 1 if a benchmark fails or is slower (or uses more memory)
+than the baseline beyond the tolerance.
+
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Tuple, Union
+
+import numpy as np
+
+BENCHMARK_GROUPS = [
+    "import",
+    "fill",
+    "fill_parallel",
+    "merge",
+    "collection",
+    "apply_config",
+    "draw",
+]
+ENTRY_SWEEP = [10**power for power in range(3, 9)]
+HIST_SWEEP = [1, 10, 100, 1000]
+DRAW_HIST_SWEEP = [1, 10, 100]
+FILL_BLOCK_SIZE = 1 << 22
+# fill_parallel cases split each filled block in 16 chunks, so 8 workers stay busy
+FILL_PARALLEL_CHUNK_SIZE = FILL_BLOCK_SIZE // 16
+FILL_WORKER_SWEEP = [1, 2, 4, 8]
+BENCH_CONFIG = {
+    "hist": {"SetLineColor": 2, "SetLineWidth": 2, "SetStats": 0},
+    "x_axis": {"SetTitle": "x axis", "SetTitleSize": 0.04, "SetRangeUser": [-3, 3]},
+    "y_axis": {"SetTitle": "y axis", "SetTitleSize": 0.04},
+}
+
+
+class BenchmarkResult(object):
+    """Result of one benchmark case.
+
+    Note:
+        elapsed is the best total time over repeats, for num_calls calls
+    processing num_entries entries. peak_rss is in MB, it is the peak of the
+    process running the case (of the whole run if not isolated).
+
+    """
+
+    def __init__(
+        self,
+        name: str,
+        elapsed: float,
+        num_calls: int,
+        num_entries: int = 0,
+        peak_rss: float = 0.0,
+        error: Union[str, None] = None,
+    ) -> None:
+        """Inits BenchmarkResult."""
+        self.name = name
+        self.elapsed = elapsed
+        self.num_calls = num_calls
+        self.num_entries = num_entries
+        self.peak_rss = peak_rss
+        self.error = error
+
+    def get_entries_per_second(self) -> float:
+        """Returns throughput, 0 for benchmarks without entries."""
+        if self.num_entries == 0 or self.elapsed == 0:
+            return 0.0
+        return self.num_entries / self.elapsed
+
+    def get_latency(self) -> float:
+        """Returns time per call in seconds."""
+        return self.elapsed / max(self.num_calls, 1)
+
+    def to_dict(self) -> dict:
+        """Returns JSON serializable result."""
+        return {
+            "elapsed": self.elapsed,
+            "num_calls": self.num_calls,
+            "num_entries": self.num_entries,
+            "latency": self.get_latency(),
+            "entries_per_second": self.get_entries_per_second(),
+            "peak_rss": self.peak_rss,
+            "error": self.error,
+        }
+
+
+def compare_with_baseline(
+    results: List[BenchmarkResult], baseline: dict, tolerance: float = 0.2
+) -> List[str]:
+    """Returns descriptions of regressions with respect to the baseline.
+
+    Note:
+        A case regresses if its latency or peak RSS exceeds the baseline value
+    by more than the tolerance (relative). Failed cases are regressions too,
+    cases missing in the baseline are ignored.
+
+    """
+    regressions = []
+    for result in results:
+        if result.error is not None:
+            regressions.append("{}: failed".format(result.name))
+            continue
+        reference = baseline.get("results", {}).get(result.name)
+        if reference is None:
+            continue
+        if result.get_latency() > reference["latency"] * (1 + tolerance):
+            regressions.append(
+                "{}: latency {:.4g}s > baseline {:.4g}s".format(
+                    result.name, result.get_latency(), reference["latency"]
+                )
+            )
+        if result.peak_rss > reference["peak_rss"] * (1 + tolerance):
+            regressions.append(
+                "{}: peak RSS {:.1f}MB > baseline {:.1f}MB".format(
+                    result.name, result.peak_rss, reference["peak_rss"]
+                )
+            )
+    return regressions
+
+
+def format_results(
+    results: List[BenchmarkResult], baseline: Union[dict, None] = None
+) -> str:
+    """Returns text table of results, with latency ratio to baseline if given."""
+    lines = [
+        "{:<40} {:>7} {:>12} {:>14} {:>10} {:>9}".format(
+            "benchmark", "calls", "latency[ms]", "entries/s", "RSS[MB]", "vs base"
+        )
+    ]
+    for result in results:
+        if result.error is not None:
+            lines.append("{:<40} FAILED: {}".format(result.name, result.error))
+            continue
+        ratio = ""
+        if baseline is not None:
+            reference = baseline.get("results", {}).get(result.name)
+            if reference is not None and reference["latency"] > 0:
+                ratio = "{:.2f}x".format(result.get_latency() / reference["latency"])
+        lines.append(
+            "{:<40} {:>7} {:>12.4f} {:>14.4g} {:>10.1f} {:>9}".format(
+                result.name,
+                result.num_calls,
+                1e3 * result.get_latency(),
+                result.get_entries_per_second(),
+                result.peak_rss,
+                ratio,
+            )
+        )
+    return "\n".join(lines)
+
+
+def get_cases(
+    groups: List[str] = BENCHMARK_GROUPS,
+    max_entries: int = ENTRY_SWEEP[-1],
+    max_hists: int = HIST_SWEEP[-1],
+) -> List[Tuple[str, str, dict]]:
+    """Returns (case name, group, parameters) of the benchmark cases."""
+    cases = []
+    for group in groups:
+        if group not in BENCHMARK_GROUPS:
+            raise ValueError("Unknown benchmark group: {}".format(group))
+        if group in ["import", "apply_config"]:
+            cases.append((group, group, {}))
+        elif group == "fill":
+            for backend in ["root", "numpy"]:
+                for num_entries in ENTRY_SWEEP:
+                    if num_entries <= max_entries:
+                        cases.append(
+                            (
+                                "fill[{},n={:.0e}]".format(backend, num_entries),
+                                group,
+                                {"backend": backend, "num_entries": num_entries},
+                            )
+                        )
+        elif group == "fill_parallel":
+            num_entries = min(ENTRY_SWEEP[-1], max_entries)
+            for backend in ["root", "numpy"]:
+                for workers in FILL_WORKER_SWEEP:
+                    cases.append(
+                        (
+                            "fill[{},workers={},n={:.0e}]".format(
+                                backend, workers, num_entries
+                            ),
+                            group,
+                            {
+                                "backend": backend,
+                                "num_entries": num_entries,
+                                "workers": workers,
+                                "chunk_size": FILL_PARALLEL_CHUNK_SIZE,
+                            },
+                        )
+                    )
+        elif group == "merge":
+            for engine in ["merge_hists", "merge_engine"]:
+                for num_hists in HIST_SWEEP:
+                    if num_hists <= max_hists:
+                        cases.append(
+                            (
+                                "merge[{},hists={}]".format(engine, num_hists),
+                                group,
+                                {"engine": engine, "num_hists": num_hists},
+                            )
+                        )
+        elif group == "collection":
+            for copy_hists in [True, False]:
+                for num_hists in HIST_SWEEP:
+                    if num_hists <= max_hists:
+                        cases.append(
+                            (
+                                "collection[copy={},hists={}]".format(
+                                    copy_hists, num_hists
+                                ),
+                                group,
+                                {"copy_hists": copy_hists, "num_hists": num_hists},
+                            )
+                        )
+        elif group == "draw":
+            for num_hists in DRAW_HIST_SWEEP:
+                if num_hists <= max_hists:
+                    cases.append(
+                        (
+                            "draw_save[hists={}]".format(num_hists),
+                            group,
+                            {"num_hists": num_hists},
+                        )
+                    )
+    return cases
+
+
+def load_baseline(baseline_path: str) -> dict:
+    """Returns baseline stored by save_baseline."""
+    with open(baseline_path) as baseline_file:
+        return json.load(baseline_file)
+
+
+def main(argv: Union[List[str], None] = None) -> int:
+    """Runs benchmarks from command line, returns exit status."""
+    parser = argparse.ArgumentParser(description="Benchmarks of th1_tools.")
+    parser.add_argument("--groups", nargs="+", default=BENCHMARK_GROUPS)
+    parser.add_argument("--max-entries", type=float, default=ENTRY_SWEEP[-1])
+    parser.add_argument("--max-hists", type=int, default=HIST_SWEEP[-1])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--save-baseline", default=None)
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="run all cases in this process instead of one process per case",
+    )
+    args = parser.parse_args(argv)
+    cases = get_cases(args.groups, int(args.max_entries), args.max_hists)
+    results = run_benchmarks(cases, repeat=args.repeat, isolate=not args.in_process)
+    baseline = None
+    if args.baseline is not None:
+        baseline = load_baseline(args.baseline)
+    print(format_results(results, baseline))
+    if args.save_baseline is not None:
+        save_baseline(results, args.save_baseline)
+    if baseline is not None:
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+    else:
+        regressions = [
+            "{}: failed".format(result.name)
+            for result in results
+            if result.error is not None
+        ]
+    for regression in regressions:
+        print("REGRESSION " + regression)
+    return 1 if regressions else 0
+
+
+def run_benchmarks(
+    cases: List[Tuple[str, str, dict]], repeat: int = 3, isolate: bool = True
+) -> List[BenchmarkResult]:
+    """Runs benchmark cases, each in a fresh spawned process if isolate."""
+    if not isolate:
+        return [run_case(*case, repeat=repeat) for case in cases]
+    results = []
+    with multiprocessing.get_context("spawn").Pool(1, maxtasksperchild=1) as pool:
+        for case in cases:
+            results.append(pool.apply(run_case, case, {"repeat": repeat}))
+    return results
+
+
+def run_case(name: str, group: str, params: dict, repeat: int = 3) -> BenchmarkResult:
+    """Runs one benchmark case, keeping the best of repeat runs."""
+    try:
+        # numpy-backend fill cases must run without ROOT installed
+        if group != "import" and params.get("backend", "root") == "root":
+            from HEPTools.plot_utils.lazy_root import ROOT
+
+            ROOT.gROOT.SetBatch(True)
+        bench_func = _BENCH_FUNCTIONS[group]
+        best = None
+        for _ in range(repeat):
+            elapsed, num_calls, num_entries = bench_func(**params)
+            if best is None or elapsed < best[0]:
+                best = (elapsed, num_calls, num_entries)
+    except Exception as error:
+        return BenchmarkResult(name, 0.0, 0, error=repr(error))
+    return BenchmarkResult(name, *best, peak_rss=_get_peak_rss())
+
+
+def save_baseline(results: List[BenchmarkResult], baseline_path: str) -> None:
+    """Stores successful results as baseline, with machine information."""
+    baseline = {
+        "machine": {
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "python": platform.python_version(),
+        },
+        "results": {
+            result.name: result.to_dict() for result in results if result.error is None
+        },
+    }
+    with open(baseline_path, "w") as baseline_file:
+        json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+
+
+def _bench_apply_config(num_calls: int = 1000) -> Tuple[float, int, int]:
+    """Times apply_config of a histogram with a typical style config."""
+    from HEPTools.plot_utils import th1_tools
+
+    hist = th1_tools.TH1DTool("bench", "bench", 100, -5, 5, config=BENCH_CONFIG)
+    start_time = time.perf_counter()
+    for _ in range(num_calls):
+        hist.apply_config()
+    return time.perf_counter() - start_time, num_calls, 0
+
+
+def _bench_collection(copy_hists: bool, num_hists: int) -> Tuple[float, int, int]:
+    """Times HistCollection construction (deep copies or views)."""
+    from HEPTools.plot_utils import th1_tools
+
+    hists = _make_hists(num_hists)
+    start_time = time.perf_counter()
+    collection = th1_tools.HistCollection(hists, copy_hists=copy_hists)
+    elapsed = time.perf_counter() - start_time
+    collection.release_canvas()
+    return elapsed, 1, 0
+
+
+def _bench_draw(num_hists: int) -> Tuple[float, int, int]:
+    """Times drawing and saving a HistCollection."""
+    from HEPTools.plot_utils import th1_tools
+
+    hists = _make_hists(num_hists)
+    collection = th1_tools.HistCollection(hists, name="bench", copy_hists=False)
+    with tempfile.TemporaryDirectory() as save_dir:
+        start_time = time.perf_counter()
+        collection.draw()
+        collection.save(save_dir=save_dir, release_canvas=True)
+        elapsed = time.perf_counter() - start_time
+    return elapsed, 1, 0
+
+
+def _bench_fill(
+    backend: str,
+    num_entries: int,
+    workers: int = 1,
+    chunk_size: Union[int, None] = None,
+) -> Tuple[float, int, int]:
+    """Times filling a 1D histogram with num_entries normal entries.
+
+    Note:
+        The same block of at most FILL_BLOCK_SIZE entries is filled repeatedly,
+    so large sweeps don't need all entries in memory.
+
+    """
+    from HEPTools.plot_utils import th1_tools
+
+    if chunk_size is None:
+        chunk_size = th1_tools.FILL_CHUNK_SIZE
+    block = np.random.default_rng(1).normal(size=min(num_entries, FILL_BLOCK_SIZE))
+    hist = th1_tools.TH1DTool("bench", "bench", 100, -5, 5, backend=backend)
+    num_calls = 0
+    start_time = time.perf_counter()
+    for start in range(0, num_entries, len(block)):
+        hist.fill_hist(
+            block[: num_entries - start], chunk_size=chunk_size, workers=workers
+        )
+        num_calls += 1
+    return time.perf_counter() - start_time, num_calls, num_entries
+
+
+def _bench_import() -> Tuple[float, int, int]:
+    """Times importing th1_tools in a fresh interpreter.
+
+    Raises:
+        ValueError: if the import initialises ROOT.
+
+    """
+    code = (
+        "import sys, time\n"
+        "start_time = time.perf_counter()\n"
+        "import HEPTools.plot_utils.th1_tools\n"
+        "print(time.perf_counter() - start_time, 'ROOT' in sys.modules)\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout.split()
+    if output[1] == "True":
+        raise ValueError("Importing th1_tools imports ROOT.")
+    return float(output[0]), 1, 0
+
+
+def _bench_merge(engine: str, num_hists: int) -> Tuple[float, int, int]:
+    """Times merging num_hists histograms."""
+    from HEPTools.plot_utils import merge_engine, plot_utils
+
+    hists = _make_hists(num_hists)
+    start_time = time.perf_counter()
+    if engine == "merge_engine":
+        merge_engine.merge_hists(hists)
+    else:
+        plot_utils.merge_hists(hists)
+    return time.perf_counter() - start_time, 1, 0
+
+
+def _get_peak_rss() -> float:
+    """Returns peak resident set size of the process in MB."""
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kB on Linux, bytes on macOS
+    if sys.platform == "darwin":
+        return peak_rss / (1 << 20)
+    return peak_rss / (1 << 10)
+
+
+def _make_hists(num_hists: int, num_entries: int = 1000) -> list:
+    """Returns filled TH1DTool histograms."""
+    from HEPTools.plot_utils import th1_tools
+
+    rng = np.random.default_rng(1)
+    hists = []
+    for hist_id in range(num_hists):
+        hist = th1_tools.TH1DTool(
+            "bench_{}".format(hist_id), "bench", 100, -5, 5, config=BENCH_CONFIG
+        )
+        hist.fill_hist(rng.normal(size=num_entries))
+        hists.append(hist)
+    return hists
+
+
+_BENCH_FUNCTIONS = {
+    "import": _bench_import,
+    "fill": _bench_fill,
+    "fill_parallel": _bench_fill,
+    "merge": _bench_merge,
+    "collection": _bench_collection,
+    "apply_config": _bench_apply_config,
+    "draw": _bench_draw,
+}
+
+
+if __name__ == "__main__":
+    sys.exit(main())
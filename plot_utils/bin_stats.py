@@ -0,0 +1,99 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from HEPTools.plot_utils import hist_array
+
+
+class BinStats(object):
+    """Bin statistics of a collection of 1D histograms.
+
+    A class to compute the quantities needed to draw a collection of histograms
+    together (non-empty bin range, maximum, integral and normalization factor)
+    in one vectorized pass over the bin contents of all histograms.
+
+    Note:
+        Bin contents of histograms with the same binning are stacked into one
+    (number of histograms, number of bins) array. Bin numbers follow ROOT
+    convention (1 is the first in-range bin), -1 means no bin found.
+        Normalized quantities are for histograms scaled by their
+    norm_factors, i.e. to unit integral with bin widths (histograms with zero
+    integral are not scaled).
+
+    """
+
+    def __init__(self, arrays: List[hist_array.HistArray]) -> None:
+        """Inits BinStats with hist_array.HistArray of each histogram."""
+        rows = [array.get_inner().reshape(-1) for array in arrays]
+        widths = [array.get_bin_widths().reshape(-1) for array in arrays]
+        if len(set(len(row) for row in rows)) == 1:
+            contents = np.stack(rows).astype(np.float64)
+            self.integrals = (contents * np.stack(widths)).sum(axis=1)
+        else:
+            # different binnings can't be stacked, pad to a common length
+            num_bins = max(len(row) for row in rows)
+            contents = np.zeros((len(rows), num_bins))
+            for row_id, row in enumerate(rows):
+                contents[row_id, : len(row)] = row
+            self.integrals = np.array(
+                [(row * width).sum() for row, width in zip(rows, widths)]
+            )
+        self.num_bins = np.array([len(row) for row in rows])
+        self.norm_factors = np.ones(len(rows))
+        nonzero = self.integrals != 0
+        self.norm_factors[nonzero] = 1 / self.integrals[nonzero]
+        normalized = contents * self.norm_factors[:, np.newaxis]
+        padding = np.arange(contents.shape[1]) >= self.num_bins[:, np.newaxis]
+        contents[padding] = -np.inf
+        normalized[padding] = -np.inf
+        self.first_bins, self.last_bins = _find_bins_above(contents)
+        self.maxima = contents.max(axis=1)
+        self.norm_first_bins, self.norm_last_bins = _find_bins_above(normalized)
+        self.norm_maxima = normalized.max(axis=1)
+
+    def get_maximum(self, normalized: bool = False) -> float:
+        """Returns highest bin content among all histograms."""
+        if normalized:
+            return float(self.norm_maxima.max())
+        return float(self.maxima.max())
+
+    def get_range(self, normalized: bool = False) -> Tuple[int, int]:
+        """Returns (first, last) bin above zero among all histograms.
+
+        Note:
+            first is the smallest first bin and last the largest last bin, so
+        -1 is returned as first if any histogram is empty.
+
+        """
+        if normalized:
+            return int(self.norm_first_bins.min()), int(self.norm_last_bins.max())
+        return int(self.first_bins.min()), int(self.last_bins.max())
+
+
+def get_summed_maximum(arrays: List[hist_array.HistArray]) -> float:
+    """Returns highest bin content of the sum of the histograms.
+
+    Note:
+        Contents are summed in storage precision and in input order, as
+    TH1::Merge does, without creating a merged histogram.
+
+    """
+    summed = np.array(arrays[0].get_inner(), copy=True)
+    for array in arrays[1:]:
+        if not arrays[0].is_compatible(array):
+            raise ValueError("Can't add histograms with different binning.")
+        summed += array.get_inner().astype(summed.dtype, copy=False)
+    return float(summed.max())
+
+
+def _find_bins_above(
+    contents: np.ndarray, threshold: float = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns first and last bins above threshold of each row, as TH1 does."""
+    above = contents > threshold
+    has_above = above.any(axis=1)
+    first_bins = np.where(has_above, above.argmax(axis=1) + 1, -1)
+    last_bins = np.where(
+        has_above, contents.shape[1] - above[:, ::-1].argmax(axis=1), -1
+    )
+    return first_bins, last_bins
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import collections
+from typing import Tuple
+
+from HEPTools.plot_utils.lazy_root import ROOT
+
+
+class CanvasPool(object):
+    """Pool of reusable ROOT canvases.
+
+    A class to hand out cleared canvases keyed by size and pad layout, and to
+    take them back when plots are saved, so long batch jobs don't allocate a
+    new TCanvas per plot.
+
+    Note:
+        At most max_size idle canvases are kept, the least recently used one
+    is closed when the cap is exceeded. Canvases in use are not counted.
+
+    """
+
+    def __init__(self, max_size: int = 8) -> None:
+        """Inits CanvasPool."""
+        self.max_size = max_size
+        self._idle = collections.OrderedDict()
+        self._in_use = {}
+        self._num_created = 0
+
+    def acquire(
+        self,
+        title: str = "",
+        width: int = 800,
+        height: int = 600,
+        divide: Tuple[int, int] = (1, 1),
+    ) -> ROOT.TCanvas:
+        """Returns a cleared canvas with given size and pad layout."""
+        key = (width, height, tuple(divide))
+        for canvas_id in reversed(self._idle):
+            canvas_key, canvas = self._idle[canvas_id]
+            if canvas_key == key:
+                del self._idle[canvas_id]
+                self._reset_canvas(canvas, divide)
+                break
+        else:
+            # unique names avoid ROOT replacing existing canvases
+            self._num_created += 1
+            canvas = ROOT.TCanvas(
+                "pool_canvas_{}".format(self._num_created), title, width, height
+            )
+            if tuple(divide) != (1, 1):
+                canvas.Divide(divide[0], divide[1])
+        canvas.SetTitle(title)
+        self._in_use[id(canvas)] = (key, canvas)
+        return canvas
+
+    def clear(self) -> None:
+        """Closes all idle canvases."""
+        while self._idle:
+            _, (_, canvas) = self._idle.popitem(last=False)
+            canvas.Close()
+
+    def get_num_idle(self) -> int:
+        """Returns number of idle canvases in the pool."""
+        return len(self._idle)
+
+    def release(self, canvas: ROOT.TCanvas) -> bool:
+        """Takes back a canvas handed out by the pool.
+
+        Note:
+            Returns False (and does nothing) if the canvas doesn't belong to
+        the pool.
+
+        """
+        canvas_item = self._in_use.pop(id(canvas), None)
+        if canvas_item is None:
+            return False
+        self._idle[id(canvas)] = canvas_item
+        self._evict()
+        return True
+
+    def set_max_size(self, max_size: int) -> None:
+        """Sets the maximum number of idle canvases."""
+        self.max_size = max_size
+        self._evict()
+
+    def _evict(self) -> None:
+        """Closes least recently used idle canvases above the cap."""
+        while len(self._idle) > self.max_size:
+            _, (_, canvas) = self._idle.popitem(last=False)
+            canvas.Close()
+
+    def _reset_canvas(self, canvas: ROOT.TCanvas, divide: Tuple[int, int]) -> None:
+        """Clears canvas content and pad settings for reuse."""
+        if tuple(divide) == (1, 1):
+            canvas.Clear()
+            canvas.SetLogy(0)
+        else:
+            canvas.Clear("D")
+            for pad_id in range(1, divide[0] * divide[1] + 1):
+                canvas.cd(pad_id).SetLogy(0)
+        canvas.cd()
+
+
+_default_pool = CanvasPool()
+
+
+def get_canvas_pool() -> CanvasPool:
+    """Returns the default canvas pool."""
+    return _default_pool
+
+
+def set_canvas_pool_size(max_size: int) -> None:
+    """Sets the maximum number of idle canvases of the default pool."""
+    _default_pool.set_max_size(max_size)
@@ -0,0 +1,65 @@
+import collections
+import concurrent.futures
+import os
+from typing import Iterator, List, Union
+
+import numpy as np
+
+from HEPTools.plot_utils import hist_array
+
+
+def get_num_workers(workers: Union[int, None]) -> int:
+    """Returns number of fill workers, None means one per core."""
+    if workers is None:
+        return os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def iter_partials(
+    template: hist_array.HistArray,
+    blocks: Iterator[List[np.ndarray]],
+    num_axes: int,
+    workers: Union[int, None] = None,
+    max_in_flight: Union[int, None] = None,
+) -> Iterator[hist_array.HistArray]:
+    """Yields partial histograms of the fill blocks, in block order.
+
+    Note:
+        Each block (coordinates of num_axes axes followed by optional
+    weights) is filled by a pool of worker threads into private empty copies
+    of template, one per fill unit of the block (see
+    hist_array.HistArray.fill_bins). Blocks are views of the inputs, so no
+    input data is copied, and numpy releases the GIL in the binning and
+    bincount kernels. At most 2 * workers blocks are in flight, or
+    max_in_flight if it is lower (e.g. to bound memory).
+        Adding the partials to a histogram in the yielded order gives exactly
+    the same result as filling the blocks one by one with HistArray.fill,
+    whatever the number of workers.
+
+    """
+    workers = get_num_workers(workers)
+    window = 2 * workers
+    if max_in_flight is not None:
+        window = max(1, min(window, max_in_flight))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = collections.deque()
+        for block in blocks:
+            pending.append(executor.submit(_fill_partials, template, block, num_axes))
+            if len(pending) >= window:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _fill_partials(
+    template: hist_array.HistArray, block: List[np.ndarray], num_axes: int
+) -> List[hist_array.HistArray]:
+    """Returns empty copies of template filled with each fill unit of a block."""
+    partials = []
+    for start in range(0, len(block[0]), hist_array.FILL_UNIT_SIZE):
+        partial = template.empty_copy()
+        unit = [array[start : start + hist_array.FILL_UNIT_SIZE] for array in block]
+        weights = unit[num_axes] if len(unit) > num_axes else None
+        partial.fill(*unit[:num_axes], weights=weights)
+        partials.append(partial)
+    return partials
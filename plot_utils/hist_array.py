@@ -0,0 +1,650 @@
+import copy
+import functools
+import math
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from HEPTools.plot_utils.lazy_root import ROOT
+
+ROOT_TYPE_DTYPES = {
+    "TH1D": np.float64,
+    "TH1F": np.float32,
+    "TH2D": np.float64,
+    "TH2F": np.float32,
+}
+# number of entries summed together by a fill, see HistArray.fill_bins
+FILL_UNIT_SIZE = 1 << 16
+# number of (source axis, target edges) bin maps kept by the rebinning cache
+REBIN_CACHE_SIZE = 256
+
+
+class HistArray(object):
+    """Array-backed histogram storage.
+
+    A class to hold 1D/2D histogram numerics (bin edges, sum of weights, sum of
+    squared weights and fill statistics) as numpy arrays, so that filling,
+    merging, scaling and integrating don't need ROOT.
+
+    Note:
+        sumw/sumw2 include under/overflow bins and have shape (nbins + 2,) for
+    1D or (nbinsy + 2, nbinsx + 2) for 2D, so the flattened arrays follow ROOT
+    global bin numbering.
+        stats follows TH1::GetStats layout: [sumw, sumw2, sumwx, sumwx2] for 1D
+    and [sumw, sumw2, sumwx, sumwx2, sumwy, sumwy2, sumwxy] for 2D.
+
+    """
+
+    def __init__(
+        self,
+        edges: List[np.ndarray],
+        dtype: type = np.float64,
+        uniform: Union[List[bool], None] = None,
+    ) -> None:
+        """Inits HistArray with bin edges of each axis (x axis first)."""
+        self.edges = [np.asarray(axis_edges, dtype=np.float64) for axis_edges in edges]
+        if len(self.edges) not in (1, 2):
+            raise ValueError("Only 1D/2D histograms are supported.")
+        if uniform is None:
+            uniform = [False] * len(self.edges)
+        self.uniform = list(uniform)
+        shape = tuple(len(axis_edges) + 1 for axis_edges in reversed(self.edges))
+        self.sumw = np.zeros(shape, dtype=dtype)
+        self.sumw2 = np.zeros(shape, dtype=np.float64)
+        self.stats = np.zeros(4 if len(self.edges) == 1 else 7)
+        self.entries = 0.0
+
+    @classmethod
+    def from_uniform(
+        cls, axes: List[Tuple[int, float, float]], dtype: type = np.float64
+    ) -> "HistArray":
+        """Creates HistArray with fixed bin width axes given as (nbin, low, up)."""
+        edges = [np.linspace(low, up, nbin + 1) for nbin, low, up in axes]
+        return cls(edges, dtype=dtype, uniform=[True] * len(edges))
+
+    @classmethod
+    def from_root(cls, hist: "ROOT.TH1", copy_arrays: bool = False) -> "HistArray":
+        """Creates HistArray from ROOT histogram.
+
+        Note:
+            If copy_arrays is False, sumw (and sumw2 if the histogram stores
+        it) are views on the ROOT histogram memory, so no bin data is copied.
+
+        """
+        class_name = hist.ClassName()
+        if class_name not in ROOT_TYPE_DTYPES:
+            raise ValueError("Unsupported histogram type: {}".format(class_name))
+        axes = [hist.GetXaxis()]
+        if hist.GetDimension() == 2:
+            axes.append(hist.GetYaxis())
+        edges = []
+        uniform = []
+        for axis in axes:
+            if axis.IsVariableBinSize():
+                edges.append(
+                    _root_buffer(axis.GetXbins().GetArray(), axis.GetNbins() + 1)
+                )
+                uniform.append(False)
+            else:
+                edges.append(
+                    np.linspace(axis.GetXmin(), axis.GetXmax(), axis.GetNbins() + 1)
+                )
+                uniform.append(True)
+        dtype = ROOT_TYPE_DTYPES[class_name]
+        hist_array = cls.__new__(cls)
+        hist_array.edges = [np.array(axis_edges, dtype=np.float64) for axis_edges in edges]
+        hist_array.uniform = uniform
+        shape = tuple(len(axis_edges) + 1 for axis_edges in reversed(hist_array.edges))
+        num_cells = hist.GetNcells()
+        hist_array.sumw = _root_buffer(hist.GetArray(), num_cells, dtype).reshape(shape)
+        if hist.GetSumw2N() > 0:
+            hist_array.sumw2 = _root_buffer(
+                hist.GetSumw2().GetArray(), num_cells
+            ).reshape(shape)
+        else:
+            hist_array.sumw2 = hist_array.sumw.astype(np.float64)
+        if copy_arrays:
+            hist_array.sumw = hist_array.sumw.copy()
+            hist_array.sumw2 = hist_array.sumw2.copy()
+        hist_array.stats = np.zeros(4 if len(edges) == 1 else 7)
+        hist.GetStats(hist_array.stats)
+        hist_array.entries = hist.GetEntries()
+        return hist_array
+
+    @property
+    def ndim(self) -> int:
+        """Returns number of axes."""
+        return len(self.edges)
+
+    def add(self, other: "HistArray", scale: float = 1.0) -> None:
+        """Adds other histogram (times scale) to this one, as TH1::Add does."""
+        if not self.is_compatible(other):
+            raise ValueError("Can't add histograms with different binning.")
+        self.sumw += scale * other.sumw
+        self.sumw2 += scale * scale * other.sumw2
+        stats_scale = np.full(len(self.stats), float(scale))
+        stats_scale[1] = scale * scale
+        self.stats += stats_scale * other.stats
+        self.entries += other.entries
+
+    def copy(self) -> "HistArray":
+        """Returns a deep copy of the histogram arrays."""
+        return copy.deepcopy(self)
+
+    def divide(self, other: "HistArray") -> None:
+        """Divides by other histogram bin by bin, as TH1::Divide does.
+
+        Note:
+            Bins with zero denominator are set to zero. Errors are propagated
+        assuming uncorrelated histograms, stats are recomputed from bin
+        centers.
+
+        """
+        if not self.is_compatible(other):
+            raise ValueError("Can't divide histograms with different binning.")
+        numerator = self.sumw.astype(np.float64)
+        denominator = other.sumw.astype(np.float64)
+        nonzero = denominator != 0
+        safe_denominator = np.where(nonzero, denominator, 1.0)
+        ratio = np.where(nonzero, numerator / safe_denominator, 0.0)
+        ratio_err2 = np.where(
+            nonzero,
+            (
+                self.sumw2 * denominator * denominator
+                + other.sumw2 * numerator * numerator
+            )
+            / safe_denominator ** 4,
+            0.0,
+        )
+        self.sumw[...] = ratio
+        self.sumw2[...] = ratio_err2
+        self.reset_stats()
+
+    def empty_copy(self) -> "HistArray":
+        """Returns histogram with the same binning and dtype, without contents."""
+        return _new_like(
+            self, np.zeros_like(self.sumw), np.zeros(self.sumw2.shape, dtype=np.float64)
+        )
+
+    def extend_axis(self, axis_id: int, low: float, up: float) -> None:
+        """Extends a fixed bin width axis to contain [low, up], as TH1::ExtendAxis.
+
+        Note:
+            The axis range is doubled until it contains both values while the
+        number of bins is kept, so old bins merge into new ones without
+        splitting. Under/overflow contents are kept in the new under/overflow.
+        Non-finite limits are ignored, as in TH1::FindNewAxisLimits, so such
+        entries end up in under/overflow.
+
+        """
+        if not self.uniform[axis_id]:
+            raise ValueError("Only fixed bin width axes can be extended.")
+        old_edges = self.edges[axis_id]
+        nbin = len(old_edges) - 1
+        new_low = old_edges[0]
+        new_up = old_edges[-1]
+        axis_range = new_up - new_low
+        while math.isfinite(low) and low < new_low:
+            new_low -= axis_range
+            axis_range *= 2
+        while math.isfinite(up) and up >= new_up:
+            new_up += axis_range
+            axis_range *= 2
+        if new_low == old_edges[0] and new_up == old_edges[-1]:
+            return
+        new_edges = np.linspace(new_low, new_up, nbin + 1)
+        old_centers = 0.5 * (old_edges[:-1] + old_edges[1:])
+        self.edges[axis_id] = new_edges
+        bin_map = np.concatenate(
+            ([0], self.find_bins(axis_id, old_centers), [nbin + 1])
+        )
+        # array axis order is reversed with respect to histogram axes
+        array_axis = self.ndim - 1 - axis_id
+        new_shape = list(self.sumw.shape)
+        for name in ("sumw", "sumw2"):
+            old_array = getattr(self, name)
+            new_array = np.zeros(new_shape, dtype=old_array.dtype)
+            for old_bin, new_bin in enumerate(bin_map):
+                index = [slice(None)] * self.ndim
+                new_index = list(index)
+                index[array_axis] = old_bin
+                new_index[array_axis] = new_bin
+                new_array[tuple(new_index)] += old_array[tuple(index)]
+            setattr(self, name, new_array)
+
+    def fill(self, *coordinates: np.ndarray, weights=None) -> None:
+        """Fills the histogram with one coordinate array per axis.
+
+        Note:
+            Arrays are truncated to the shortest length. Entries in
+        under/overflow bins count in entries but not in stats, as in ROOT.
+
+        """
+        coordinates = [np.asarray(array, dtype=np.float64) for array in coordinates]
+        if len(coordinates) != self.ndim:
+            raise ValueError("Expect {} fill arrays.".format(self.ndim))
+        arrays = list(coordinates)
+        if weights is not None:
+            arrays.append(np.asarray(weights, dtype=np.float64))
+        array_len = min(len(array) for array in arrays)
+        arrays = [array[:array_len] for array in arrays]
+        axis_indices = [
+            self.find_bins(axis_id, arrays[axis_id]) for axis_id in range(self.ndim)
+        ]
+        self.fill_bins(
+            axis_indices,
+            arrays[: self.ndim],
+            weights=None if weights is None else arrays[-1],
+        )
+
+    def fill_bins(
+        self,
+        axis_indices: List[np.ndarray],
+        coordinates: List[np.ndarray],
+        weights: Union[np.ndarray, None] = None,
+    ) -> None:
+        """Fills the histogram with precomputed bin numbers of each axis.
+
+        Note:
+            axis_indices are find_bins results of the float64 coordinates,
+        which are still needed for stats. Histograms with the same binning can
+        share them, see multi_filler.MultiFiller. All arrays must have the same
+        length.
+            Entries are summed in units of FILL_UNIT_SIZE entries from the
+        start of the arrays, each unit being added to the contents on its own.
+        Filling consecutive blocks whose lengths are multiples of
+        FILL_UNIT_SIZE therefore gives exactly the same result as one fill of
+        the concatenated arrays.
+
+        """
+        for start in range(0, len(axis_indices[0]), FILL_UNIT_SIZE):
+            stop = start + FILL_UNIT_SIZE
+            self._fill_unit(
+                [indices[start:stop] for indices in axis_indices],
+                [coordinate[start:stop] for coordinate in coordinates],
+                None if weights is None else weights[start:stop],
+            )
+
+    def find_bins(self, axis_id: int, values: np.ndarray) -> np.ndarray:
+        """Returns ROOT bin numbers (0 for underflow, nbins + 1 for overflow)."""
+        axis_edges = self.edges[axis_id]
+        nbin = len(axis_edges) - 1
+        low = axis_edges[0]
+        up = axis_edges[-1]
+        values = np.asarray(values, dtype=np.float64)
+        if self.uniform[axis_id]:
+            # same arithmetic as TAxis::FindBin
+            with np.errstate(invalid="ignore"):
+                indices = 1 + (nbin * (values - low) / (up - low)).astype(np.int64)
+        else:
+            indices = np.searchsorted(axis_edges, values, side="right")
+        indices[values < low] = 0
+        indices[~(values < up)] = nbin + 1
+        return indices
+
+    def find_first_bin_above(self, threshold: float = 0) -> int:
+        """Returns first in-range bin above threshold, -1 if not found (1D)."""
+        found = np.flatnonzero(self.sumw[1:-1] > threshold)
+        return int(found[0]) + 1 if len(found) else -1
+
+    def find_last_bin_above(self, threshold: float = 0) -> int:
+        """Returns last in-range bin above threshold, -1 if not found (1D)."""
+        found = np.flatnonzero(self.sumw[1:-1] > threshold)
+        return int(found[-1]) + 1 if len(found) else -1
+
+    def get_bin_widths(self) -> np.ndarray:
+        """Returns widths (areas for 2D) of in-range bins."""
+        widths = [np.diff(axis_edges) for axis_edges in self.edges]
+        if self.ndim == 1:
+            return widths[0]
+        return np.outer(widths[1], widths[0])
+
+    def get_global_bins(self, axis_indices: List[np.ndarray]) -> np.ndarray:
+        """Returns ROOT global bin numbers from per-axis bin numbers."""
+        if self.ndim == 1:
+            return axis_indices[0]
+        return axis_indices[0] + (len(self.edges[0]) + 1) * axis_indices[1]
+
+    def get_inner(self, array: Union[np.ndarray, None] = None) -> np.ndarray:
+        """Returns view of in-range bins of array (default: sumw)."""
+        if array is None:
+            array = self.sumw
+        return array[(slice(1, -1),) * self.ndim]
+
+    def get_maximum(self) -> float:
+        """Returns maximum in-range bin content."""
+        return float(self.get_inner().max())
+
+    def get_relative_error_band(self) -> "HistArray":
+        """Returns band with contents 1 and errors equal to relative errors.
+
+        Note:
+            Empty bins get content and error 0. Unlike dividing the histogram by
+        itself, the errors are not doubled in quadrature.
+
+        """
+        sumw = self.sumw.astype(np.float64)
+        nonzero = sumw != 0
+        safe_sumw = np.where(nonzero, sumw, 1.0)
+        band = _new_like(
+            self,
+            np.where(nonzero, 1.0, 0.0),
+            np.where(nonzero, self.sumw2 / (safe_sumw * safe_sumw), 0.0),
+        )
+        band.entries = self.entries
+        band.reset_stats()
+        return band
+
+    def get_sum_of_weights(self) -> float:
+        """Returns sum of in-range bin contents."""
+        return float(self.get_inner().sum(dtype=np.float64))
+
+    def integral(self, option: str = "") -> float:
+        """Returns in-range integral, option "width" multiplies by bin widths."""
+        inner = self.get_inner().astype(np.float64)
+        if "width" in option:
+            return float((inner * self.get_bin_widths()).sum())
+        return float(inner.sum())
+
+    def is_compatible(self, other: "HistArray") -> bool:
+        """Checks whether other histogram has the same binning."""
+        if self.ndim != other.ndim:
+            return False
+        for edges, other_edges in zip(self.edges, other.edges):
+            if len(edges) != len(other_edges) or not np.allclose(edges, other_edges):
+                return False
+        return True
+
+    def rebin(self, new_edges: np.ndarray, axis_id: int = 0) -> "HistArray":
+        """Returns new histogram with bins of an axis merged into new_edges.
+
+        Note:
+            See rebin_many, which rebins many histograms in one pass.
+
+        """
+        return rebin_many([self], new_edges, axis_id)[0]
+
+    def reset(self) -> None:
+        """Resets contents, errors and stats."""
+        self.sumw[...] = 0
+        self.sumw2[...] = 0
+        self.stats[...] = 0
+        self.entries = 0.0
+
+    def reset_stats(self) -> None:
+        """Recomputes stats from bin contents and centers, as TH1::ResetStats."""
+        centers = [0.5 * (axis_edges[:-1] + axis_edges[1:]) for axis_edges in self.edges]
+        contents = self.get_inner().astype(np.float64)
+        if self.ndim == 1:
+            x = centers[0]
+            y = None
+        else:
+            x, y = np.meshgrid(centers[0], centers[1])
+        self.stats[0] = contents.sum()
+        self.stats[1] = self.get_inner(self.sumw2).sum()
+        self.stats[2] = (contents * x).sum()
+        self.stats[3] = (contents * x * x).sum()
+        if y is not None:
+            self.stats[4] = (contents * y).sum()
+            self.stats[5] = (contents * y * y).sum()
+            self.stats[6] = (contents * x * y).sum()
+
+    def scale(self, factor: float) -> None:
+        """Scales contents by factor (errors by factor), as TH1::Scale does."""
+        self.sumw *= self.sumw.dtype.type(factor)
+        self.sumw2 *= factor * factor
+        self.stats *= factor
+        self.stats[1] *= factor
+
+    def subtract(self, other: "HistArray") -> None:
+        """Removes other histogram added before, inverse of add(other).
+
+        Note:
+            Errors are subtracted too, so the result equals a histogram that
+        never had other added (up to rounding).
+
+        """
+        if not self.is_compatible(other):
+            raise ValueError("Can't subtract histograms with different binning.")
+        self.sumw -= other.sumw.astype(self.sumw.dtype, copy=False)
+        self.sumw2 -= other.sumw2
+        self.stats -= other.stats
+        self.entries -= other.entries
+
+    def to_root(
+        self, name: str, title: str, root_type: Union[str, None] = None
+    ) -> "ROOT.TH1":
+        """Returns a new ROOT histogram holding a copy of the arrays.
+
+        Note:
+            root_type defaults to TH1D/TH1F/TH2D/TH2F depending on dimension
+        and dtype.
+
+        """
+        if root_type is None:
+            root_type = "TH{}{}".format(
+                self.ndim, "F" if self.sumw.dtype == np.float32 else "D"
+            )
+        axis_args = []
+        for axis_edges, is_uniform in zip(self.edges, self.uniform):
+            if is_uniform:
+                axis_args += [len(axis_edges) - 1, axis_edges[0], axis_edges[-1]]
+            else:
+                axis_args += [len(axis_edges) - 1, np.ascontiguousarray(axis_edges)]
+        hist = getattr(ROOT, root_type)(name, title, *axis_args)
+        hist.Sumw2()
+        num_cells = self.sumw.size
+        hist.SetContent(
+            np.ascontiguousarray(self.sumw, dtype=np.float64).reshape(-1)
+        )
+        hist.GetSumw2().Set(
+            num_cells, np.ascontiguousarray(self.sumw2, dtype=np.float64).reshape(-1)
+        )
+        hist.PutStats(np.ascontiguousarray(self.stats, dtype=np.float64))
+        hist.SetEntries(self.entries)
+        return hist
+
+    def _fill_unit(
+        self,
+        axis_indices: List[np.ndarray],
+        coordinates: List[np.ndarray],
+        weights: Union[np.ndarray, None],
+    ) -> None:
+        """Adds one fill unit to contents, entries and stats, see fill_bins."""
+        array_len = len(axis_indices[0])
+        global_indices = self.get_global_bins(axis_indices)
+        num_cells = self.sumw.size
+        if weights is None:
+            counts = np.bincount(global_indices, minlength=num_cells)
+            counts = counts.reshape(self.sumw.shape)
+            self.sumw += counts.astype(self.sumw.dtype)
+            self.sumw2 += counts
+            weights = np.ones(array_len)
+        else:
+            self.sumw += (
+                np.bincount(global_indices, weights=weights, minlength=num_cells)
+                .reshape(self.sumw.shape)
+                .astype(self.sumw.dtype)
+            )
+            self.sumw2 += np.bincount(
+                global_indices, weights=weights * weights, minlength=num_cells
+            ).reshape(self.sumw2.shape)
+        self.entries += array_len
+        # stats only count in-range entries
+        in_range = np.ones(array_len, dtype=bool)
+        for axis_id, indices in enumerate(axis_indices):
+            in_range &= (indices > 0) & (indices < len(self.edges[axis_id]))
+        weights = weights[in_range]
+        x = coordinates[0][in_range]
+        self.stats[0] += weights.sum()
+        self.stats[1] += (weights * weights).sum()
+        self.stats[2] += (weights * x).sum()
+        self.stats[3] += (weights * x * x).sum()
+        if self.ndim == 2:
+            y = coordinates[1][in_range]
+            self.stats[4] += (weights * y).sum()
+            self.stats[5] += (weights * y * y).sum()
+            self.stats[6] += (weights * x * y).sum()
+
+
+def divide_many(
+    numerators: List[HistArray], denominator: HistArray
+) -> List[HistArray]:
+    """Returns ratios of each numerator to the denominator, as HistArray.divide.
+
+    Note:
+        All ratios are computed in one vectorized pass over (number of
+    numerators, number of bins) arrays, and are float64 row views of the two
+    resulting arrays, so no per-ratio arrays are allocated.
+
+    """
+    for numerator in numerators:
+        if not numerator.is_compatible(denominator):
+            raise ValueError("Can't divide histograms with different binning.")
+    numerator_sumw = np.stack([array.sumw.reshape(-1) for array in numerators])
+    numerator_sumw = numerator_sumw.astype(np.float64, copy=False)
+    numerator_sumw2 = np.stack([array.sumw2.reshape(-1) for array in numerators])
+    denominator_sumw = denominator.sumw.reshape(-1).astype(np.float64)
+    denominator_sumw2 = denominator.sumw2.reshape(-1)
+    nonzero = denominator_sumw != 0
+    safe_denominator = np.where(nonzero, denominator_sumw, 1.0)
+    ratio = np.where(nonzero, numerator_sumw / safe_denominator, 0.0)
+    ratio_err2 = np.where(
+        nonzero,
+        (
+            numerator_sumw2 * denominator_sumw * denominator_sumw
+            + denominator_sumw2 * numerator_sumw * numerator_sumw
+        )
+        / safe_denominator ** 4,
+        0.0,
+    )
+    shape = denominator.sumw.shape
+    ratios = []
+    for row_id, numerator in enumerate(numerators):
+        ratio_array = _new_like(
+            denominator, ratio[row_id].reshape(shape), ratio_err2[row_id].reshape(shape)
+        )
+        ratio_array.entries = numerator.entries
+        ratio_array.reset_stats()
+        ratios.append(ratio_array)
+    return ratios
+
+
+def rebin_many(
+    arrays: List[HistArray], new_edges: np.ndarray, axis_id: int = 0
+) -> List[HistArray]:
+    """Returns histograms with bins of an axis merged into new, variable edges.
+
+    Note:
+        new_edges must be a subset of the current edges of each histogram, as
+    in TH1::Rebin. Contents outside the new range go to under/overflow bins.
+    Contents and sumw2 are summed in float64 and stored in the original dtype.
+    Entries are kept. Stats are kept if the axis range is unchanged, else they
+    are recomputed from the new bin contents (see reset_stats), since entries
+    moved to under/overflow no longer count in them.
+        The bin map of each (source axis, new edges) pair is cached (see
+    REBIN_CACHE_SIZE). Histograms with the same binning are stacked and
+    rebinned in one np.add.reduceat call.
+
+    Raises:
+        ValueError: if new_edges are not aligned with the current edges.
+
+    """
+    new_edges = np.asarray(new_edges, dtype=np.float64)
+    target_key = tuple(new_edges.tolist())
+    groups = {}
+    for array_id, array in enumerate(arrays):
+        edges_key = tuple(tuple(axis_edges.tolist()) for axis_edges in array.edges)
+        groups.setdefault(edges_key, []).append(array_id)
+    new_uniform = _is_uniform(new_edges)
+    rebinned = [None] * len(arrays)
+    for edges_key, array_ids in groups.items():
+        template = arrays[array_ids[0]]
+        source_edges = edges_key[axis_id]
+        same_range = (
+            source_edges[0] == target_key[0] and source_edges[-1] == target_key[-1]
+        )
+        starts = _get_rebin_starts(source_edges, target_key)
+        # axis 0 of the stack is the histogram, histogram axes are reversed
+        stack_axis = template.ndim - axis_id
+        sumw = np.add.reduceat(
+            np.stack([arrays[array_id].sumw for array_id in array_ids]),
+            starts,
+            axis=stack_axis,
+            dtype=np.float64,
+        )
+        sumw2 = np.add.reduceat(
+            np.stack([arrays[array_id].sumw2 for array_id in array_ids]),
+            starts,
+            axis=stack_axis,
+        )
+        for row_id, array_id in enumerate(array_ids):
+            array = arrays[array_id]
+            new_array = _new_like(
+                array, sumw[row_id].astype(array.sumw.dtype, copy=False), sumw2[row_id]
+            )
+            new_array.edges[axis_id] = new_edges.copy()
+            new_array.uniform[axis_id] = new_uniform
+            if same_range:
+                new_array.stats = array.stats.copy()
+            else:
+                new_array.reset_stats()
+            new_array.entries = array.entries
+            rebinned[array_id] = new_array
+    return rebinned
+
+
+@functools.lru_cache(maxsize=REBIN_CACHE_SIZE)
+def _get_rebin_starts(
+    source_edges: Tuple[float, ...], target_edges: Tuple[float, ...]
+) -> np.ndarray:
+    """Returns first source bin (ROOT numbering) of each target bin, flows included.
+
+    Note:
+        The returned array is read-only since it is shared through the cache.
+
+    """
+    source = np.array(source_edges)
+    target = np.array(target_edges)
+    if len(target) < 2 or np.any(np.diff(target) <= 0):
+        raise ValueError("New bin edges must be increasing.")
+    tolerance = 1e-10 * (source[-1] - source[0])
+    positions = np.searchsorted(source, target - tolerance)
+    positions = np.minimum(positions, len(source) - 1)
+    if np.any(np.abs(source[positions] - target) > tolerance):
+        raise ValueError("New bin edges must be a subset of the current edges.")
+    # source edge k is the low edge of source bin k + 1
+    starts = np.concatenate(([0], positions + 1))
+    starts.setflags(write=False)
+    return starts
+
+
+def _is_uniform(edges: np.ndarray) -> bool:
+    """Checks whether edges are equally spaced."""
+    return bool(
+        np.allclose(
+            edges, np.linspace(edges[0], edges[-1], len(edges)), rtol=0, atol=1e-12
+        )
+    )
+
+
+def _new_like(template: HistArray, sumw: np.ndarray, sumw2: np.ndarray) -> HistArray:
+    """Returns HistArray with binning of template using given arrays (not copied)."""
+    hist_array = HistArray.__new__(HistArray)
+    hist_array.edges = [axis_edges.copy() for axis_edges in template.edges]
+    hist_array.uniform = list(template.uniform)
+    hist_array.sumw = sumw
+    hist_array.sumw2 = sumw2
+    hist_array.stats = np.zeros(len(template.stats))
+    hist_array.entries = 0.0
+    return hist_array
+
+
+def _root_buffer(pointer, count: int, dtype: type = np.float64) -> np.ndarray:
+    """Returns numpy view on a ROOT C array pointer."""
+    if hasattr(pointer, "reshape"):
+        # cppyy low level views need an explicit shape
+        reshaped = pointer.reshape((count,))
+        if reshaped is not None:
+            pointer = reshaped
+    return np.frombuffer(pointer, dtype=dtype, count=count)
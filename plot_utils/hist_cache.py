@@ -0,0 +1,243 @@
+import collections.abc
+import json
+import struct
+from typing import Dict, Iterator, List, Union
+
+import numpy as np
+
+from HEPTools.plot_utils import hist_array, th1_tools
+
+CACHE_MAGIC = b"HEPCACHE"
+CACHE_VERSION = 1
+# alignment (bytes) of the header end and of each data block
+CACHE_ALIGNMENT = 64
+# magic, format version, reserved, header length
+CACHE_PREAMBLE = struct.Struct("<8sIIQ")
+# histogram classes, with their binning attributes (nbin, low, up) per axis
+CACHE_HIST_CLASSES = {
+    "TH1Tool": [],
+    "TH1DTool": [("nbin", "xlow", "xup")],
+    "TH1FTool": [("nbin", "xlow", "xup")],
+    "TH2Tool": [],
+    "TH2FTool": [("nbinx", "xlow", "xup"), ("nbiny", "ylow", "yup")],
+}
+
+
+class HistCache(collections.abc.Mapping):
+    """Lazy read-only mapping of the objects in a histogram cache file.
+
+    A class to reopen a cache written by save_cache without reading the bin
+    data: the file is memory-mapped, only the JSON header is parsed when
+    opening, and each object is materialised when it is first accessed.
+
+    Note:
+        Values are TH1Tool, THStackTool or HistCollection objects, which are
+    kept once materialised. Histograms are array-backed, with bin arrays
+    viewing the mapped file copy-on-write: untouched bins are never read, and
+    modifying a histogram doesn't change the file. Materialising neither
+    imports ROOT nor takes a canvas, this is done when first drawn.
+
+    """
+
+    def __init__(self, cache_path: str) -> None:
+        """Inits HistCache, reading the header of the cache file.
+
+        Raises:
+            ValueError: if the file is not a cache file of a supported version.
+
+        """
+        self.cache_path = cache_path
+        with open(cache_path, "rb") as cache_file:
+            preamble = cache_file.read(CACHE_PREAMBLE.size)
+            if len(preamble) != CACHE_PREAMBLE.size:
+                raise ValueError("Not a histogram cache file: {}".format(cache_path))
+            magic, version, _, header_len = CACHE_PREAMBLE.unpack(preamble)
+            if magic != CACHE_MAGIC:
+                raise ValueError("Not a histogram cache file: {}".format(cache_path))
+            if version != CACHE_VERSION:
+                raise ValueError(
+                    "Unsupported cache version {} in {}".format(version, cache_path)
+                )
+            header = json.loads(cache_file.read(header_len).decode("utf-8"))
+        self._records = header["objects"]
+        self._data_start = _align(CACHE_PREAMBLE.size + header_len)
+        self._buffer = None
+        self._objects = {}
+
+    def __getitem__(self, key: str):
+        materialised = self._objects.get(key)
+        if materialised is None:
+            materialised = self._objects[key] = self._materialise(self._records[key])
+        return materialised
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get_kind(self, key: str) -> str:
+        """Returns "hist", "stack" or "collection", without materialising."""
+        return self._records[key]["kind"]
+
+    def _get_block(self, block: dict) -> np.ndarray:
+        """Returns view of a data block in the mapped file."""
+        if self._buffer is None:
+            # copy-on-write mapping, created on first access
+            self._buffer = np.memmap(self.cache_path, dtype=np.uint8, mode="c")
+        dtype = np.dtype(block["dtype"])
+        start = self._data_start + block["offset"]
+        count = int(np.prod(block["shape"]))
+        return (
+            self._buffer[start : start + count * dtype.itemsize]
+            .view(dtype)
+            .reshape(block["shape"])
+        )
+
+    def _materialise(self, record: dict):
+        """Returns object described by a header record."""
+        if record["kind"] == "hist":
+            return self._materialise_hist(record)
+        hist_list = [self._materialise_hist(member) for member in record["members"]]
+        if record["kind"] == "stack":
+            return th1_tools.THStackTool(
+                record["name"], record["title"], hist_list, copy_hists=False
+            )
+        return th1_tools.HistCollection(
+            hist_list, name=record["name"], title=record["title"], copy_hists=False
+        )
+
+    def _materialise_hist(self, record: dict) -> "th1_tools.TH1Tool":
+        """Returns array-backed histogram tool described by a header record."""
+        array = hist_array.HistArray.__new__(hist_array.HistArray)
+        array.edges = [self._get_block(block) for block in record["edges"]]
+        array.uniform = list(record["uniform"])
+        array.sumw = self._get_block(record["sumw"])
+        array.sumw2 = self._get_block(record["sumw2"])
+        array.stats = np.array(record["stats"], dtype=np.float64)
+        array.entries = record["entries"]
+        class_name = record["class"]
+        if class_name not in CACHE_HIST_CLASSES:
+            raise ValueError("Unsupported histogram class: {}".format(class_name))
+        # skip the subclass init, which would allocate empty bin arrays
+        hist_class = getattr(th1_tools, class_name)
+        hist = hist_class.__new__(hist_class)
+        th1_tools.TH1Tool.__init__(
+            hist,
+            record["name"],
+            record["title"],
+            config=record["config"],
+            backend="numpy",
+        )
+        for axis_edges, attribute_names in zip(
+            array.edges, CACHE_HIST_CLASSES[class_name]
+        ):
+            nbin_name, low_name, up_name = attribute_names
+            setattr(hist, nbin_name, len(axis_edges) - 1)
+            setattr(hist, low_name, float(axis_edges[0]))
+            setattr(hist, up_name, float(axis_edges[-1]))
+        hist.set_hist_array(array)
+        return hist
+
+
+def load_cache(cache_path: str) -> HistCache:
+    """Returns lazy mapping of the objects in a cache file, see HistCache."""
+    return HistCache(cache_path)
+
+
+def save_cache(
+    cache_path: str,
+    objects: Dict[
+        str,
+        Union["th1_tools.TH1Tool", "th1_tools.THStackTool", "th1_tools.HistCollection"],
+    ],
+) -> None:
+    """Writes histograms, stacks and collections to one cache file.
+
+    Note:
+        The file holds a small JSON header (name, title, class and config of
+    each histogram, block offsets) followed by edges, sumw and sumw2 of each
+    histogram as raw little-endian blocks, each aligned to CACHE_ALIGNMENT
+    bytes. Configs must be JSON serializable. Reload with load_cache.
+
+    Raises:
+        ValueError: if an object is not supported or its config is not JSON
+    serializable.
+
+    """
+    blocks = []
+    records = {}
+    for key, cached_object in objects.items():
+        if isinstance(cached_object, th1_tools.TH1Tool):
+            records[key] = _get_hist_record(cached_object, blocks)
+        elif isinstance(
+            cached_object, (th1_tools.THStackTool, th1_tools.HistCollection)
+        ):
+            records[key] = {
+                "kind": (
+                    "stack"
+                    if isinstance(cached_object, th1_tools.THStackTool)
+                    else "collection"
+                ),
+                "name": cached_object.name,
+                "title": cached_object.title,
+                "members": [
+                    _get_hist_record(hist, blocks)
+                    for hist in cached_object.get_hist_list()
+                ],
+            }
+        else:
+            raise ValueError(
+                "Can't cache object of type {}".format(type(cached_object))
+            )
+    try:
+        header = json.dumps({"objects": records}).encode("utf-8")
+    except TypeError as error:
+        raise ValueError("Config is not JSON serializable: {}".format(error))
+    data_start = _align(CACHE_PREAMBLE.size + len(header))
+    with open(cache_path, "wb") as cache_file:
+        cache_file.write(
+            CACHE_PREAMBLE.pack(CACHE_MAGIC, CACHE_VERSION, 0, len(header))
+        )
+        cache_file.write(header)
+        cache_file.write(b"\0" * (data_start - CACHE_PREAMBLE.size - len(header)))
+        position = 0
+        for offset, block_array in blocks:
+            cache_file.write(b"\0" * (offset - position))
+            cache_file.write(block_array.tobytes())
+            position = offset + block_array.nbytes
+
+
+def _add_block(array: np.ndarray, blocks: List[tuple]) -> dict:
+    """Queues array as little-endian data block, returns its header entry."""
+    dtype = array.dtype.newbyteorder("<")
+    array = np.ascontiguousarray(array, dtype=dtype)
+    offset = 0
+    if blocks:
+        last_offset, last_array = blocks[-1]
+        offset = _align(last_offset + last_array.nbytes)
+    blocks.append((offset, array))
+    return {"offset": offset, "dtype": dtype.str, "shape": list(array.shape)}
+
+
+def _align(position: int) -> int:
+    """Returns position rounded up to CACHE_ALIGNMENT."""
+    return -(-position // CACHE_ALIGNMENT) * CACHE_ALIGNMENT
+
+
+def _get_hist_record(hist: "th1_tools.TH1Tool", blocks: List[tuple]) -> dict:
+    """Returns header record of a histogram, queueing its data blocks."""
+    array = hist.get_hist_array()
+    return {
+        "kind": "hist",
+        "class": type(hist).__name__,
+        "name": hist.name,
+        "title": hist.title,
+        "config": hist.get_config(),
+        "edges": [_add_block(axis_edges, blocks) for axis_edges in array.edges],
+        "uniform": [bool(is_uniform) for is_uniform in array.uniform],
+        "sumw": _add_block(array.sumw, blocks),
+        "sumw2": _add_block(array.sumw2, blocks),
+        "stats": [float(value) for value in array.stats],
+        "entries": float(array.entries),
+    }
@@ -0,0 +1,157 @@
+import concurrent.futures
+import multiprocessing
+import os
+import sqlite3
+from typing import List, Tuple, Union
+
+from HEPTools.plot_utils.lazy_root import ROOT
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS keys (
+    file_id INTEGER NOT NULL REFERENCES files(file_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    directory TEXT NOT NULL,
+    class_name TEXT NOT NULL,
+    cycle INTEGER NOT NULL,
+    nbytes INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS keys_name ON keys(name);
+CREATE INDEX IF NOT EXISTS keys_file ON keys(file_id);
+"""
+
+
+class KeyIndex(object):
+    """Persistent index of the objects in a set of ROOT files.
+
+    A class to record, for each ROOT file, the name, class, directory path,
+    cycle and size on disk of every object in a SQLite database, so finding
+    which files hold a histogram doesn't need to open the files.
+
+    Note:
+        Files are scanned again only when their mtime or size changed. Only
+    key headers are read, and only the highest cycle of each name is
+    recorded (see root_objects.iter_keys). Querying doesn't import ROOT.
+
+    """
+
+    def __init__(self, index_path: str) -> None:
+        """Inits KeyIndex, creating the database if needed."""
+        self.index_path = index_path
+        self._connection = sqlite3.connect(index_path)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.executescript(INDEX_SCHEMA)
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        self._connection.close()
+
+    def find(
+        self, pattern: str, class_name: Union[str, None] = None
+    ) -> List[Tuple[str, str, str, str, int, int]]:
+        """Returns matching keys as (file path, directory, name, class, cycle, bytes).
+
+        Note:
+            pattern is a glob pattern on the object name (case sensitive).
+
+        """
+        query = (
+            "SELECT files.path, keys.directory, keys.name, keys.class_name,"
+            " keys.cycle, keys.nbytes FROM keys JOIN files USING (file_id)"
+            " WHERE keys.name GLOB ?"
+        )
+        args = [pattern]
+        if class_name is not None:
+            query += " AND keys.class_name = ?"
+            args.append(class_name)
+        query += " ORDER BY files.path, keys.directory, keys.name"
+        return self._connection.execute(query, args).fetchall()
+
+    def find_files(self, pattern: str) -> List[str]:
+        """Returns paths of files holding objects with matching names."""
+        query = (
+            "SELECT DISTINCT files.path FROM keys JOIN files USING (file_id)"
+            " WHERE keys.name GLOB ? ORDER BY files.path"
+        )
+        return [row[0] for row in self._connection.execute(query, (pattern,))]
+
+    def get_indexed_files(self) -> List[str]:
+        """Returns paths of all indexed files."""
+        query = "SELECT path FROM files ORDER BY path"
+        return [row[0] for row in self._connection.execute(query)]
+
+    def remove_files(self, file_paths: List[str]) -> None:
+        """Removes files and their keys from the index."""
+        with self._connection:
+            self._connection.executemany(
+                "DELETE FROM files WHERE path = ?",
+                [(os.path.abspath(path),) for path in file_paths],
+            )
+
+    def update(self, file_paths: List[str], workers: Union[int, None] = None) -> int:
+        """Scans new or changed files in parallel and records their keys.
+
+        Note:
+            Files whose mtime and size match the index are skipped. Files are
+        scanned by a pool of spawned worker processes, or in the current
+        process if workers is 1. Returns the number of scanned files.
+
+        """
+        recorded = {
+            path: (mtime, size)
+            for path, mtime, size in self._connection.execute(
+                "SELECT path, mtime, size FROM files"
+            )
+        }
+        outdated_paths = []
+        for path in file_paths:
+            path = os.path.abspath(path)
+            file_stat = os.stat(path)
+            if recorded.get(path) != (file_stat.st_mtime, file_stat.st_size):
+                outdated_paths.append(path)
+        if workers == 1 or len(outdated_paths) <= 1:
+            scan_results = map(_scan_file, outdated_paths)
+            self._record(scan_results)
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                self._record(executor.map(_scan_file, outdated_paths))
+        return len(outdated_paths)
+
+    def _record(self, scan_results) -> None:
+        """Replaces index entries of scanned files, in one transaction."""
+        with self._connection:
+            for path, mtime, size, rows in scan_results:
+                self._connection.execute("DELETE FROM files WHERE path = ?", (path,))
+                file_id = self._connection.execute(
+                    "INSERT INTO files (path, mtime, size) VALUES (?, ?, ?)",
+                    (path, mtime, size),
+                ).lastrowid
+                self._connection.executemany(
+                    "INSERT INTO keys VALUES (?, ?, ?, ?, ?, ?)",
+                    [(file_id,) + row for row in rows],
+                )
+
+
+def _scan_file(file_path: str) -> Tuple[str, float, int, list]:
+    """Returns (path, mtime, size, key rows) of a ROOT file."""
+    from HEPTools.plot_utils import root_objects
+
+    file_stat = os.stat(file_path)
+    root_file = ROOT.TFile.Open(file_path)
+    if not root_file or root_file.IsZombie():
+        raise ValueError("Can't open file: {}".format(file_path))
+    rows = []
+    try:
+        for key_path, class_name, key in root_objects.iter_keys(root_file):
+            directory, _, name = key_path.rpartition("/")
+            rows.append((name, directory, class_name, key.GetCycle(), key.GetNbytes()))
+    finally:
+        root_file.Close()
+    return file_path, file_stat.st_mtime, file_stat.st_size, rows
@@ -0,0 +1,37 @@
+import importlib
+import sys
+from types import ModuleType
+
+
+class LazyModule(object):
+    """Proxy of a module imported on first attribute access.
+
+    A class to defer expensive imports (PyROOT initialisation takes seconds)
+    until the module is actually used, so importing HEPTools stays fast for
+    config parsing, file-list generation and array-only code paths.
+
+    """
+
+    def __init__(self, module_name: str) -> None:
+        """Inits LazyModule with the name of the module to import."""
+        self._module_name = module_name
+        self._module = None
+
+    def __getattr__(self, name: str):
+        return getattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        return "LazyModule({!r}, loaded={})".format(self._module_name, self.is_loaded())
+
+    def is_loaded(self) -> bool:
+        """Checks whether the module has been imported (by anyone)."""
+        return self._module is not None or self._module_name in sys.modules
+
+    def load(self) -> ModuleType:
+        """Imports the module if needed and returns it."""
+        if self._module is None:
+            self._module = importlib.import_module(self._module_name)
+        return self._module
+
+
+ROOT = LazyModule("ROOT")
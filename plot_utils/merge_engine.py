@@ -0,0 +1,112 @@
+import collections
+import concurrent.futures
+import multiprocessing
+import os
+from typing import Iterator, Union
+
+from HEPTools.plot_utils import hist_array
+from HEPTools.plot_utils.lazy_root import ROOT
+
+MERGE_BATCH_SIZE = 64
+
+
+def merge_hists(
+    inputs: list,
+    hist_name: Union[str, None] = None,
+    workers: Union[int, None] = None,
+    batch_size: int = MERGE_BATCH_SIZE,
+) -> hist_array.HistArray:
+    """Returns sum of input histograms as hist_array.HistArray.
+
+    Note:
+        inputs may mix TH1Tool objects and paths of ROOT files holding partial
+    results, hist_name is the key of the histogram to read from the files.
+    Files are read by a pool of worker processes, at most batch_size inputs
+    ahead, while results are reduced. Reading and unpacking files dominates,
+    so the reduction itself is one in-place whole-array add per input, in
+    input order, and the result is bit-identical to plot_utils.merge_hists
+    (TH1::Merge) whatever the number of workers.
+
+    Raises:
+        ValueError: if inputs is empty, a file path is given without
+    hist_name, or binnings differ.
+
+    """
+    if len(inputs) == 0:
+        raise ValueError("No histograms to merge.")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    merged = None
+    for array in _iter_hist_arrays(inputs, hist_name, workers, batch_size):
+        if merged is None:
+            merged = array.copy()
+            merged.reset()
+        _add_array(merged, array)
+    return merged
+
+
+def _add_array(merged: hist_array.HistArray, array: hist_array.HistArray) -> None:
+    """Adds one histogram to merged, as TH1::Merge does for each input."""
+    if not merged.is_compatible(array):
+        raise ValueError("Can't merge histograms with different binning.")
+    # add in the storage precision, as TH1F::AddBinContent does
+    merged.sumw += array.sumw.astype(merged.sumw.dtype, copy=False)
+    merged.sumw2 += array.sumw2
+    merged.stats += array.stats
+    merged.entries += array.entries
+
+
+def _iter_hist_arrays(
+    inputs: list, hist_name: Union[str, None], workers: int, window: int
+) -> Iterator[hist_array.HistArray]:
+    """Yields HistArray of each input in input order.
+
+    Note:
+        At most window files are read ahead, so memory stays bounded for
+    thousands of inputs.
+
+    """
+    is_path = [isinstance(item, (str, os.PathLike)) for item in inputs]
+    if any(is_path) and hist_name is None:
+        raise ValueError("hist_name is required to merge histograms from files.")
+    if not any(is_path) or workers == 1:
+        for item, item_is_path in zip(inputs, is_path):
+            if item_is_path:
+                yield _load_hist_array(item, hist_name)
+            else:
+                yield item.get_hist_array()
+        return
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        pending = collections.deque()
+        for item, item_is_path in zip(inputs, is_path):
+            if item_is_path:
+                pending.append(executor.submit(_load_hist_array, item, hist_name))
+            else:
+                pending.append(item)
+            while len(pending) > window:
+                yield _resolve_input(pending.popleft())
+        while pending:
+            yield _resolve_input(pending.popleft())
+
+
+def _load_hist_array(file_path: str, hist_name: str) -> hist_array.HistArray:
+    """Reads histogram from ROOT file as hist_array.HistArray."""
+    root_file = ROOT.TFile.Open(str(file_path))
+    if not root_file or root_file.IsZombie():
+        raise ValueError("Can't open file: {}".format(file_path))
+    try:
+        hist = root_file.Get(hist_name)
+        if not hist:
+            raise ValueError("{} not found in {}".format(hist_name, file_path))
+        return hist_array.HistArray.from_root(hist, copy_arrays=True)
+    finally:
+        root_file.Close()
+
+
+def _resolve_input(item) -> hist_array.HistArray:
+    """Returns HistArray of a pending file read or of an in-memory TH1Tool."""
+    if isinstance(item, concurrent.futures.Future):
+        return item.result()
+    return item.get_hist_array()
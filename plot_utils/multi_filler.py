@@ -0,0 +1,173 @@
+from typing import Dict, List, Union
+
+import numpy as np
+
+from HEPTools.plot_utils import profiling, th1_tools
+
+
+class MultiFiller(object):
+    """Fills many histograms from one column table in a single pass.
+
+    A class to fill many TH1Tool objects (e.g. one per region or selection)
+    from the same in-memory columns. The data are read in chunks, and in each
+    chunk every mask, variable and weight expression is evaluated once, and
+    bin numbers are computed once per (variable, binning) and shared by all
+    histograms using them.
+
+    Example:
+        filler = MultiFiller({"pt": pt, "n_jets": n_jets, "weight": weight})
+        for region, mask in regions.items():
+            filler.add_hist(
+                TH1DTool("pt_" + region, region, 50, 0, 500),
+                "pt",
+                mask=mask,
+                weight="weight",
+            )
+        filler.run()
+
+    Note:
+        Variables, masks and weights are column names or numpy expressions
+    of the columns, e.g. "(n_jets >= 2) & (pt > 25)" or "np.abs(eta)".
+    Columns can be any array-likes supporting slicing (np.memmap included),
+    only one chunk of each is converted at a time.
+        Entries are added to the current contents. For array-backed
+    histograms the result is identical to fill_hist of the masked entries of
+    each chunk with the same chunk_size.
+
+    """
+
+    def __init__(
+        self,
+        columns: Dict[str, np.ndarray],
+        chunk_size: int = th1_tools.FILL_CHUNK_SIZE,
+    ) -> None:
+        """Inits MultiFiller with {name: array} columns of the same length."""
+        self.columns = columns
+        self.chunk_size = chunk_size
+        self._specs = []
+
+    def add_hist(
+        self,
+        hist: "th1_tools.TH1Tool",
+        variables: Union[str, List[str]],
+        mask: Union[str, None] = None,
+        weight: Union[str, None] = None,
+    ) -> "th1_tools.TH1Tool":
+        """Adds a histogram to be filled by the next run() and returns it.
+
+        Note:
+            variables is one expression for 1D histograms, [x, y] for 2D.
+
+        """
+        if isinstance(variables, str):
+            variables = [variables]
+        if len(variables) != hist.get_hist_array().ndim:
+            raise ValueError(
+                "Expect {} variables for {}.".format(
+                    hist.get_hist_array().ndim, hist.name
+                )
+            )
+        self._specs.append((hist, list(variables), mask, weight))
+        return hist
+
+    def get_num_hists(self) -> int:
+        """Returns number of histograms waiting for run()."""
+        return len(self._specs)
+
+    @profiling.profiled("multi_fill")
+    def run(self) -> List["th1_tools.TH1Tool"]:
+        """Fills all added histograms in one chunked pass over the columns.
+
+        Note:
+            Returns the histograms in the order they were added, which become
+        array-backed. The histogram list is cleared afterwards.
+
+        """
+        specs = self._specs
+        self._specs = []
+        if not specs:
+            return []
+        arrays = [hist.get_hist_array().copy() for hist, *_ in specs]
+        binning_keys = [
+            [
+                (tuple(axis_edges.tolist()), is_uniform)
+                for axis_edges, is_uniform in zip(array.edges, array.uniform)
+            ]
+            for array in arrays
+        ]
+        num_entries = min(len(column) for column in self.columns.values())
+        for start in range(0, num_entries, self.chunk_size):
+            chunk = {
+                name: column[start : start + self.chunk_size]
+                for name, column in self.columns.items()
+            }
+            # evaluated expressions and bin numbers, shared within the chunk
+            values = {}
+            selected = {}
+            for (hist, variables, mask, weight), array, binning_key in zip(
+                specs, arrays, binning_keys
+            ):
+                axis_indices = []
+                coordinates = []
+                for axis_id, variable in enumerate(variables):
+                    key = (variable, binning_key[axis_id], mask)
+                    if key not in selected:
+                        coordinate = self._evaluate(variable, chunk, values)
+                        indices_key = ("bins", variable, binning_key[axis_id])
+                        indices = values.get(indices_key)
+                        if indices is None:
+                            indices = values[indices_key] = array.find_bins(
+                                axis_id, coordinate
+                            )
+                        selected[key] = self._select(
+                            [indices, coordinate], mask, chunk, values
+                        )
+                    axis_indices.append(selected[key][0])
+                    coordinates.append(selected[key][1])
+                weights = None
+                if weight is not None:
+                    key = (weight, None, mask)
+                    if key not in selected:
+                        selected[key] = self._select(
+                            [self._evaluate(weight, chunk, values)], mask, chunk, values
+                        )
+                    weights = selected[key][0]
+                array.fill_bins(axis_indices, coordinates, weights=weights)
+        for (hist, *_), array in zip(specs, arrays):
+            hist.set_hist_array(array)
+        return [hist for hist, *_ in specs]
+
+    def _evaluate(
+        self, expression: str, chunk: Dict[str, np.ndarray], values: dict
+    ) -> np.ndarray:
+        """Returns float64 values of an expression in the chunk, cached."""
+        result = values.get(expression)
+        if result is None:
+            result = values[expression] = np.asarray(
+                _eval_expression(expression, chunk), dtype=np.float64
+            )
+        return result
+
+    def _select(
+        self,
+        arrays: List[np.ndarray],
+        mask: Union[str, None],
+        chunk: Dict[str, np.ndarray],
+        values: dict,
+    ) -> List[np.ndarray]:
+        """Returns arrays restricted to the entries passing the mask."""
+        if mask is None:
+            return arrays
+        passed = values.get(("mask", mask))
+        if passed is None:
+            passed = values[("mask", mask)] = np.asarray(
+                _eval_expression(mask, chunk), dtype=bool
+            )
+        return [array[passed] for array in arrays]
+
+
+def _eval_expression(expression: str, chunk: Dict[str, np.ndarray]):
+    """Returns column of the chunk, or value of a numpy expression of columns."""
+    if expression in chunk:
+        return chunk[expression]
+    return eval(expression, {"__builtins__": {}, "np": np}, chunk)
@@ -1,22 +1,120 @@
+from __future__ import annotations
+
+import collections.abc
 import copy
-from typing import Dict, List, Union
+import itertools
+import math
+import os
+import sys
+from typing import Iterator, List, Tuple, Union
+
+import numpy as np
+from HEPTools.plot_utils import bin_stats, hist_array, profiling, root_objects
+from HEPTools.plot_utils.lazy_root import ROOT
+
+# estimated float64 copies of each fill input alive per entry of a fill block
+FILL_BLOCK_COPIES = 4
+SUPPORTED_HIST_CLASSES = ["TH1D", "TH1F"]
+
 
-import ROOT
+def as_arrays(arrays: list) -> List[np.ndarray]:
+    """Returns numpy arrays of the inputs, without copying buffer-protocol inputs."""
+    return [
+        np.asarray(array)
+        if has_buffer_protocol(array)
+        else np.fromiter(array, dtype=np.float64)
+        for array in arrays
+    ]
+
+
+def get_array_range(array, chunk_size: int = 1 << 20) -> Tuple[float, float]:
+    """Returns (min, max) of array, ignoring NaN and infinite values.
+
+    Note:
+        Min and max are computed block by block in one sweep over the array, so
+    each block is read from memory once. Returns (inf, -inf) if no value is
+    finite.
+
+    """
+    array = np.asarray(array).reshape(-1)
+    array_min = math.inf
+    array_max = -math.inf
+    for start in range(0, len(array), chunk_size):
+        block = array[start : start + chunk_size]
+        block = block[np.isfinite(block)]
+        if len(block) == 0:
+            continue
+        array_min = min(array_min, float(block.min()))
+        array_max = max(array_max, float(block.max()))
+    return array_min, array_max
+
+
+def get_fill_chunk_size(
+    num_arrays: int, chunk_size: int, max_memory: Union[int, None] = None
+) -> int:
+    """Returns fill block size keeping fill buffers below max_memory bytes.
+
+    Note:
+        The estimate counts FILL_BLOCK_COPIES float64 copies of each of the
+    num_arrays inputs per entry (blocks, re-cut chunks and temporaries of the
+    numpy fill). Chunks yielded by chunk iterators are not included.
+        Block sizes from FILL_UNIT_SIZE up are rounded down to whole fill units
+    (see hist_array.HistArray.fill_bins) and max_memory never lowers them below
+    one unit, so array-backed fill results don't depend on max_memory.
+
+    """
+    unit_size = hist_array.FILL_UNIT_SIZE
+    if chunk_size < unit_size:
+        return chunk_size
+    chunk_size -= chunk_size % unit_size
+    if max_memory is None:
+        return chunk_size
+    max_entries = int(max_memory) // (8 * FILL_BLOCK_COPIES * num_arrays)
+    return max(unit_size, min(chunk_size, max_entries - max_entries % unit_size))
 
 
 def get_highest_bin_value(hists: Union[list, "TH1Tool"]) -> float:
-    """Returns highest bin value among given hist list(s)"""
+    """Returns highest bin value among given hist list(s)
+
+    Note:
+        For a list, the maximum of the summed contents is computed from the
+    bin arrays, without building a merged histogram.
+
+    """
     maximum_height = 0
     if type(hists) is list:
-        merged_hist = merge_hists(hists)
-        maximum_height = merged_hist.GetMaximum()
+        maximum_height = bin_stats.get_summed_maximum(
+            [hist.get_hist_array() for hist in hists]
+        )
     else:
         maximum_height = hists.get_hist().GetMaximum()
     return maximum_height
 
 
-def get_objects_from_file(root_file_path: str) -> dict:
-    """Returns dict of all objects in the root file."""
+@profiling.profiled("read_file")
+def get_objects_from_file(
+    root_file_path: str,
+    pattern: Union[str, None] = None,
+    class_names: Union[List[str], None] = None,
+    recursive: bool = False,
+    lazy: bool = False,
+) -> Union[dict, root_objects.RootObjectMap]:
+    """Returns dict of all objects in the root file.
+
+    Note:
+        If lazy is True, or any of pattern/class_names/recursive is given, a
+    root_objects.RootObjectMap is returned instead: keys are listed without
+    reading objects, which are read on first access. See RootObjectMap for
+    the filters.
+
+    """
+    if lazy or pattern is not None or class_names is not None or recursive:
+        return root_objects.RootObjectMap(
+            root_file_path,
+            pattern=pattern,
+            class_names=class_names,
+            recursive=recursive,
+        )
     root_file = ROOT.TFile(root_file_path)
     keys = root_file.GetListOfKeys()
     object_dict = {}
@@ -45,20 +143,94 @@ def has_sub_string(check_string: str, sub_strings: Union[str, list]) -> bool:
     return False
 
 
+def has_buffer_protocol(checked_object) -> bool:
+    """Checks whether the object exposes the buffer protocol (e.g. numpy arrays)."""
+    try:
+        memoryview(checked_object)
+    except TypeError:
+        return False
+    return True
+
+
 def is_supported_hist(checked_object) -> bool:
     """Checks if the object is supported histogram type."""
-    is_th1d = False
-    is_th1f = False
-    if type(checked_object) == type(ROOT.TH1D()):
-        is_th1d = True
-    if type(checked_object) == type(ROOT.TH1F()):
-        is_th1f = True
-    if is_th1d or is_th1f:
-        return True
-    else:
-        return False
+    return any(
+        type(checked_object) is getattr(ROOT, class_name)
+        for class_name in SUPPORTED_HIST_CLASSES
+    )
 
 
+def iter_chunk_blocks(
+    chunk_iterators: list, chunk_size: int
+) -> Iterator[List[np.ndarray]]:
+    """Yields aligned contiguous float64 blocks re-cut from chunk iterators.
+
+    Note:
+        Inputs may yield chunks of any (different) sizes, the blocks are the
+    same as iter_fill_blocks of the concatenated inputs, so fills don't depend
+    on how the data are chunked. Inputs are truncated to the shortest. At most
+    one block plus one chunk of each input is held at a time.
+
+    """
+    buffers = [[] for _ in chunk_iterators]
+    buffered = [0] * len(chunk_iterators)
+    while True:
+        for input_id, chunks in enumerate(chunk_iterators):
+            while buffered[input_id] < chunk_size:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                chunk = np.asarray(chunk).reshape(-1)
+                buffers[input_id].append(chunk)
+                buffered[input_id] += len(chunk)
+        block_len = min([chunk_size] + buffered)
+        if block_len == 0:
+            return
+        block = []
+        for input_id, input_buffers in enumerate(buffers):
+            # chunks are converted to float64 only one block at a time
+            pieces = []
+            rest = []
+            num_missing = block_len
+            for chunk in input_buffers:
+                if num_missing:
+                    pieces.append(np.asarray(chunk[:num_missing], dtype=np.float64))
+                    num_missing -= len(pieces[-1])
+                    chunk = chunk[len(pieces[-1]) :]
+                if len(chunk):
+                    rest.append(chunk)
+            if len(pieces) == 1:
+                block.append(np.ascontiguousarray(pieces[0]))
+            else:
+                block.append(np.concatenate(pieces))
+            buffers[input_id] = rest
+            buffered[input_id] = sum(len(chunk) for chunk in rest)
+        yield block
+        if block_len < chunk_size:
+            return
+
+
+def iter_fill_blocks(arrays: list, chunk_size: int) -> Iterator[List[np.ndarray]]:
+    """Yields aligned contiguous float64 blocks of the given arrays.
+
+    Note:
+        Arrays are truncated to the shortest length. Contiguous float64 inputs
+    are sliced without copying, other inputs are converted block by block, so
+    at most one block per array is copied at a time.
+
+    """
+    arrays = [np.asarray(array) for array in arrays]
+    arrays = [array if array.ndim == 1 else array.reshape(-1) for array in arrays]
+    array_len = min(len(array) for array in arrays)
+    for start in range(0, array_len, chunk_size):
+        stop = min(start + chunk_size, array_len)
+        yield [
+            np.ascontiguousarray(array[start:stop], dtype=np.float64)
+            for array in arrays
+        ]
+
+
+@profiling.profiled("merge")
 def merge_hists(hist_list: List["TH1Tool"]) -> ROOT.TH1:
     """Returns merged input histograms."""
     out_hist = None
@@ -71,3 +243,50 @@ def merge_hists(hist_list: List["TH1Tool"]) -> ROOT.TH1:
         merge_list.Add(hist)
     out_hist.Merge(merge_list)
     return out_hist
+
+
+def open_fill_inputs(fill_inputs: list) -> Tuple[list, bool]:
+    """Returns (inputs, chunked) with .npy paths opened as memory maps.
+
+    Note:
+        An input is a chunk iterator if it is an iterator (e.g. a generator)
+    whose first item is an array. If any input is one, chunked is True and
+    all inputs are returned as chunk iterators (other inputs as one chunk),
+    see iter_chunk_blocks. Other inputs are returned unchanged.
+
+    """
+    opened = []
+    is_chunk_iterators = []
+    for fill_input in fill_inputs:
+        is_chunk_iterator = False
+        if isinstance(fill_input, (str, os.PathLike)):
+            fill_input = np.load(fill_input, mmap_mode="r")
+        elif isinstance(fill_input, collections.abc.Iterator):
+            first_item = next(fill_input, None)
+            if first_item is None:
+                fill_input = np.zeros(0)
+            else:
+                is_chunk_iterator = np.ndim(first_item) > 0
+                fill_input = itertools.chain([first_item], fill_input)
+        opened.append(fill_input)
+        is_chunk_iterators.append(is_chunk_iterator)
+    if not any(is_chunk_iterators):
+        return opened, False
+    return [
+        fill_input if is_chunk_iterator else iter(as_arrays([fill_input]))
+        for fill_input, is_chunk_iterator in zip(opened, is_chunk_iterators)
+    ], True
+
+
+def print_progress(num_filled: int, num_total: Union[int, None]) -> None:
+    """Prints fill progress on one line, usable as fill_hist progress callback."""
+    if num_total:
+        message = "filled {} / {} entries ({:.0%})".format(
+            num_filled, num_total, num_filled / num_total
+        )
+    else:
+        message = "filled {} entries".format(num_filled)
+    sys.stdout.write("\r" + message)
+    if num_filled == num_total:
+        sys.stdout.write("\n")
+    sys.stdout.flush()
@@ -0,0 +1,221 @@
+import collections
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from typing import Callable, Union
+
+from HEPTools.plot_utils.lazy_root import ROOT
+
+_active = threading.local()
+_enabled = False
+_events = []
+_phase_stats = collections.OrderedDict()
+_null_phase = contextlib.nullcontext()
+
+
+class PhaseStats(object):
+    """Accumulated statistics of one (phase, plot) pair."""
+
+    def __init__(self) -> None:
+        """Inits PhaseStats with zero counts."""
+        self.num_calls = 0
+        self.wall_time = 0.0
+        self.num_root_objects = 0
+
+    def add(self, wall_time: float, num_root_objects: int) -> None:
+        """Adds one call."""
+        self.num_calls += 1
+        self.wall_time += wall_time
+        self.num_root_objects += num_root_objects
+
+
+def count_root_objects() -> int:
+    """Returns number of ROOT objects alive, 0 if ROOT is not loaded.
+
+    Note:
+        If ROOT object statistics are enabled (Root.ObjectStat: 1 in .rootrc)
+    all TObjects are counted, otherwise only objects registered in gROOT
+    (histograms in memory, canvases, functions).
+
+    """
+    if not ROOT.is_loaded():
+        return 0
+    if ROOT.TObject.GetObjectStat() and ROOT.gObjectTable:
+        return ROOT.gObjectTable.Instances()
+    return (
+        ROOT.gROOT.GetList().GetSize()
+        + ROOT.gROOT.GetListOfCanvases().GetSize()
+        + ROOT.gROOT.GetListOfFunctions().GetSize()
+    )
+
+
+def disable() -> None:
+    """Disables recording, recorded data are kept."""
+    global _enabled
+    _enabled = False
+
+
+def enable() -> None:
+    """Enables recording of phases."""
+    global _enabled
+    _enabled = True
+
+
+def get_summary_table(sort_by: str = "wall_time") -> str:
+    """Returns text table of recorded phases.
+
+    Note:
+        One total row per phase (plot "*") followed by its rows per plot,
+    sorted by sort_by: "wall_time", "num_calls" or "num_root_objects". Wall
+    times of nested phases are also included in their parents.
+
+    """
+    totals = collections.OrderedDict()
+    for (phase_name, _), stats in _phase_stats.items():
+        total = totals.setdefault((phase_name, "*"), PhaseStats())
+        total.num_calls += stats.num_calls
+        total.wall_time += stats.wall_time
+        total.num_root_objects += stats.num_root_objects
+    rows = []
+    for (phase_name, _), total in sorted(
+        totals.items(), key=lambda item: getattr(item[1], sort_by), reverse=True
+    ):
+        rows.append(((phase_name, "*"), total))
+        plot_rows = [
+            item
+            for item in _phase_stats.items()
+            if item[0][0] == phase_name and item[0][1] is not None
+        ]
+        plot_rows.sort(key=lambda item: getattr(item[1], sort_by), reverse=True)
+        rows += plot_rows
+    lines = [
+        "{:<20} {:<30} {:>8} {:>12} {:>12} {:>12}".format(
+            "phase", "plot", "calls", "total [s]", "mean [ms]", "ROOT objs"
+        )
+    ]
+    for (phase_name, plot_name), stats in rows:
+        lines.append(
+            "{:<20} {:<30} {:>8} {:>12.4f} {:>12.3f} {:>12}".format(
+                phase_name,
+                str(plot_name)[:30],
+                stats.num_calls,
+                stats.wall_time,
+                1e3 * stats.wall_time / stats.num_calls,
+                stats.num_root_objects,
+            )
+        )
+    return "\n".join(lines)
+
+
+def is_enabled() -> bool:
+    """Checks whether recording is enabled."""
+    return _enabled
+
+
+def phase(phase_name: str, plot_name: Union[str, None] = None):
+    """Returns context manager recording a phase, no-op when disabled.
+
+    Example:
+        with profiling.phase("save", self.name):
+            self._canvas.SaveAs(save_path)
+
+    """
+    if not _enabled:
+        return _null_phase
+    return _record_phase(phase_name, plot_name)
+
+
+def profiled(phase_name: str) -> Callable:
+    """Returns decorator recording calls of the function as a phase.
+
+    Note:
+        For methods, the plot name is taken from the name (or _name)
+    attribute of the object. When recording is disabled the only overhead is
+    one flag check per call.
+        A phase re-entered under the same name in the same thread (e.g.
+    TH1Tool.draw called by HistCollection.draw) is only recorded by the
+    outermost call, so it is not counted twice.
+
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            plot_name = None
+            if args:
+                plot_name = getattr(args[0], "name", None)
+                if plot_name is None:
+                    plot_name = getattr(args[0], "_name", None)
+                if not isinstance(plot_name, str):
+                    plot_name = None
+            with _record_phase(phase_name, plot_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def reset() -> None:
+    """Clears recorded data."""
+    _events.clear()
+    _phase_stats.clear()
+
+
+def write_trace(trace_path: str) -> None:
+    """Writes recorded phases as JSON trace (Chrome trace event format).
+
+    Note:
+        The file can be loaded by chrome://tracing, Perfetto or speedscope.
+
+    """
+    with open(trace_path, "w") as trace_file:
+        json.dump({"traceEvents": _events, "displayTimeUnit": "ms"}, trace_file)
+
+
+def _get_active_phases() -> set:
+    """Returns names of the phases being recorded in the current thread."""
+    active_phases = getattr(_active, "phases", None)
+    if active_phases is None:
+        active_phases = _active.phases = set()
+    return active_phases
+
+
+@contextlib.contextmanager
+def _record_phase(phase_name: str, plot_name: Union[str, None]):
+    """Records wall time and ROOT objects created during the phase."""
+    active_phases = _get_active_phases()
+    if phase_name in active_phases:
+        # nested call of a phase being recorded, counted by the outer call
+        yield
+        return
+    active_phases.add(phase_name)
+    num_objects_start = count_root_objects()
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        active_phases.discard(phase_name)
+        wall_time = time.perf_counter() - start_time
+        num_root_objects = count_root_objects() - num_objects_start
+        stats = _phase_stats.get((phase_name, plot_name))
+        if stats is None:
+            stats = _phase_stats[(phase_name, plot_name)] = PhaseStats()
+        stats.add(wall_time, num_root_objects)
+        _events.append(
+            {
+                "name": phase_name,
+                "cat": "plot" if plot_name is not None else "run",
+                "ph": "X",
+                "ts": 1e6 * start_time,
+                "dur": 1e6 * wall_time,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": {"plot": plot_name, "root_objects": num_root_objects},
+            }
+        )
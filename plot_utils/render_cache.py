@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+from typing import List, Union
+
+import numpy as np
+
+FINGERPRINT_SUFFIX = ".fingerprint"
+
+
+class RenderMixin(object):
+    """Incremental rendering shared by the plot classes.
+
+    Note:
+        Subclasses provide name, title, draw() and save(), and set
+    _default_save_dir. The histograms of _hist_list are fingerprinted unless
+    _get_render_hists is overridden.
+
+    """
+
+    _default_save_dir = "plots"
+
+    def get_save_path(
+        self,
+        save_dir: Union[str, None] = None,
+        save_file_name: Union[str, None] = None,
+        save_format: str = "png",
+    ) -> str:
+        """Returns path the plot is saved to, see save()."""
+        if save_dir is None:
+            save_dir = self._default_save_dir
+        if not os.path.isabs(save_dir):
+            save_dir = "./" + save_dir
+        if save_file_name is None:
+            save_file_name = self.name
+        return save_dir + "/" + save_file_name + "." + save_format
+
+    def render(
+        self,
+        save_dir: Union[str, None] = None,
+        save_file_name: Union[str, None] = None,
+        save_format: str = "png",
+        incremental: bool = True,
+        release_canvas: bool = False,
+        **draw_kwargs
+    ) -> bool:
+        """Draws and saves the plot, skipping both if the output is up to date.
+
+        Note:
+            A fingerprint of histogram contents/errors, configs, draw options
+        (draw_kwargs are passed to draw()) and output format is recorded next
+        to the output file. If incremental is True and the recorded
+        fingerprint is unchanged, nothing is drawn or saved. release_canvas is
+        passed to save().
+
+        Returns:
+            Whether the plot was drawn and saved.
+
+        """
+        save_path = self.get_save_path(save_dir, save_file_name, save_format)
+        fingerprint = get_fingerprint(
+            self._get_render_hists(), self.name, self.title, draw_kwargs, save_format
+        )
+        if incremental and is_up_to_date(save_path, fingerprint):
+            return False
+        self.draw(**draw_kwargs)
+        self.save(save_dir, save_file_name, save_format, release_canvas)
+        record_fingerprint(save_path, fingerprint)
+        return True
+
+    def _get_render_hists(self) -> List["TH1Tool"]:
+        """Returns histograms fingerprinted by render()."""
+        return self._hist_list
+
+
+def get_fingerprint(hist_list: List["TH1Tool"], *plot_settings) -> str:
+    """Returns content hash of histograms and plot settings.
+
+    Note:
+        Bin edges, contents and errors, name, title and config of each
+    histogram are hashed, together with any JSON serializable plot settings
+    (draw options, output format...).
+
+    """
+    sha = hashlib.sha1()
+    for hist in hist_list:
+        array = hist.get_hist_array()
+        for edges in array.edges:
+            sha.update(np.ascontiguousarray(edges).tobytes())
+        sha.update(np.ascontiguousarray(array.sumw).tobytes())
+        sha.update(np.ascontiguousarray(array.sumw2).tobytes())
+        sha.update(
+            json.dumps(
+                [hist.name, hist.title, hist.get_config()], sort_keys=True, default=repr
+            ).encode("utf-8")
+        )
+    sha.update(json.dumps(plot_settings, sort_keys=True, default=repr).encode("utf-8"))
+    return sha.hexdigest()
+
+
+def get_fingerprint_path(save_path: str) -> str:
+    """Returns path of the fingerprint file recorded next to the output."""
+    return save_path + FINGERPRINT_SUFFIX
+
+
+def is_up_to_date(save_path: str, fingerprint: str) -> bool:
+    """Checks whether output exists and was made from the same fingerprint."""
+    fingerprint_path = get_fingerprint_path(save_path)
+    if not (os.path.exists(save_path) and os.path.exists(fingerprint_path)):
+        return False
+    with open(fingerprint_path) as fingerprint_file:
+        return fingerprint_file.read().strip() == fingerprint
+
+
+def record_fingerprint(save_path: str, fingerprint: str) -> None:
+    """Records fingerprint next to the output file."""
+    with open(get_fingerprint_path(save_path), "w") as fingerprint_file:
+        fingerprint_file.write(fingerprint + "\n")
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import collections
+import collections.abc
+import fnmatch
+import re
+from typing import Iterator, List, Tuple, Union
+
+from HEPTools.plot_utils.lazy_root import ROOT
+
+DIRECTORY_CLASSES = ["TDirectory", "TDirectoryFile"]
+MAX_OPEN_FILES = 16
+
+_open_files = collections.OrderedDict()
+
+
+class RootObjectMap(collections.abc.Mapping):
+    """Lazy read-only mapping of the objects in a ROOT file.
+
+    A class to list the keys of a ROOT file (and its subdirectories) without
+    reading any payload, and to read each object only when it is accessed.
+
+    Note:
+        Keys are object paths in the file, e.g. "dir/sub_dir/hist_name". Only
+    the highest cycle of each name is listed. Keys can be filtered by glob
+    pattern (or regular expression if regex is True) on the path and by class
+    name as stored in the file (e.g. ["TH1D", "TH1F", "TH2F", "THStack"]).
+        Read objects are kept in an LRU cache of max_cached_objects objects,
+    histograms are detached from the file. Files are shared through a module
+    level LRU cache of MAX_OPEN_FILES open files, objects still attached to a
+    file (e.g. trees) can't be used once it is closed.
+
+    """
+
+    def __init__(
+        self,
+        root_file_path: str,
+        pattern: Union[str, None] = None,
+        class_names: Union[List[str], None] = None,
+        recursive: bool = True,
+        regex: bool = False,
+        max_cached_objects: int = 256,
+    ) -> None:
+        """Inits RootObjectMap, listing the keys of the file."""
+        self.root_file_path = root_file_path
+        self.max_cached_objects = max_cached_objects
+        self._objects = collections.OrderedDict()
+        if pattern is None:
+            match = None
+        elif regex:
+            match = re.compile(pattern).search
+        else:
+            match = re.compile(fnmatch.translate(pattern)).match
+        self._class_names = collections.OrderedDict()
+        for key_path, class_name, _ in iter_keys(
+            get_root_file(root_file_path), recursive=recursive
+        ):
+            if match is not None and not match(key_path):
+                continue
+            if class_names is not None and class_name not in class_names:
+                continue
+            self._class_names[key_path] = class_name
+
+    def __getitem__(self, key_path: str) -> ROOT.TObject:
+        if key_path not in self._class_names:
+            raise KeyError(key_path)
+        read_object = self._objects.get(key_path)
+        if read_object is not None:
+            self._objects.move_to_end(key_path)
+            return read_object
+        read_object = get_root_file(self.root_file_path).Get(key_path)
+        if not read_object:
+            raise KeyError(key_path)
+        if isinstance(read_object, ROOT.TH1):
+            # keep histograms alive when the file is closed, trees must stay
+            # attached to their file to be read
+            read_object.SetDirectory(ROOT.nullptr)
+            ROOT.SetOwnership(read_object, True)
+        self._objects[key_path] = read_object
+        if len(self._objects) > self.max_cached_objects:
+            self._objects.popitem(last=False)
+        return read_object
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._class_names)
+
+    def __len__(self) -> int:
+        return len(self._class_names)
+
+    def get_class_name(self, key_path: str) -> str:
+        """Returns class name of the object, without reading it."""
+        return self._class_names[key_path]
+
+
+def close_root_files() -> None:
+    """Closes all files in the open file cache."""
+    while _open_files:
+        _, root_file = _open_files.popitem(last=False)
+        root_file.Close()
+
+
+def get_root_file(root_file_path: str) -> ROOT.TFile:
+    """Returns the open ROOT file, using the open file cache.
+
+    Raises:
+        ValueError: if the file can't be opened.
+
+    """
+    root_file = _open_files.get(root_file_path)
+    if root_file is not None:
+        _open_files.move_to_end(root_file_path)
+        return root_file
+    root_file = ROOT.TFile.Open(root_file_path)
+    if not root_file or root_file.IsZombie():
+        raise ValueError("Can't open file: {}".format(root_file_path))
+    _open_files[root_file_path] = root_file
+    if len(_open_files) > MAX_OPEN_FILES:
+        _, closed_file = _open_files.popitem(last=False)
+        closed_file.Close()
+    return root_file
+
+
+def iter_keys(
+    directory: ROOT.TDirectory, prefix: str = "", recursive: bool = True
+) -> Iterator[Tuple[str, str, ROOT.TKey]]:
+    """Yields (path, class name, key) of the highest cycle of each object.
+
+    Note:
+        Only key headers are read. Subdirectories are entered if recursive is
+    True, and are not yielded themselves.
+
+    """
+    seen_names = set()
+    for key in directory.GetListOfKeys():
+        name = key.GetName()
+        # keys are sorted by decreasing cycle
+        if name in seen_names:
+            continue
+        seen_names.add(name)
+        class_name = key.GetClassName()
+        key_path = prefix + name
+        if class_name in DIRECTORY_CLASSES:
+            if recursive:
+                yield from iter_keys(
+                    directory.GetDirectory(name), key_path + "/", recursive
+                )
+            continue
+        yield key_path, class_name, key
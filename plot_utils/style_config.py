@@ -0,0 +1,140 @@
+import collections
+import functools
+import hashlib
+import json
+import warnings
+from typing import Dict, List, Tuple
+
+# config section -> getter of the object the section applies to
+SECTION_GETTERS = {
+    "hist": None,
+    "x_axis": "GetXaxis",
+    "y_axis": "GetYaxis",
+    "z_axis": "GetZaxis",
+}
+MAX_SETTER_ARGS = 6
+MAX_CACHED_CONFIGS = 1024
+
+_compiled_configs = collections.OrderedDict()
+
+
+class CompiledConfig(object):
+    """Style config compiled into setter operations.
+
+    A class to hold a validated style config (see TH1Tool config) as a list of
+    (setter name, arguments) operations per section, with setters already
+    validated on the histogram/axis classes, so applying it is a plain loop of
+    calls.
+
+    Note:
+        Setters are bound on the object when applied, so static setters (e.g.
+    SetDefaultSumw2) work as well as member setters.
+
+    """
+
+    def __init__(
+        self, fingerprint: str, sections: Dict[str, List[Tuple[str, tuple]]]
+    ) -> None:
+        """Inits CompiledConfig with resolved operations of each section."""
+        self.fingerprint = fingerprint
+        self.sections = sections
+
+    def apply(self, hist: "ROOT.TH1") -> None:
+        """Applys all sections to the histogram and its axes."""
+        for section, operations in self.sections.items():
+            getter = SECTION_GETTERS[section]
+            if getter is None:
+                apply_operations(hist, operations)
+            else:
+                apply_operations(getattr(hist, getter)(), operations)
+
+    def apply_section(self, section: str, apply_object) -> None:
+        """Applys one section to the given object (histogram or axis)."""
+        apply_operations(apply_object, self.sections.get(section, []))
+
+
+def apply_operations(apply_object, operations: List[Tuple[str, tuple]]) -> None:
+    """Applys a list of (setter name, arguments) operations to the object."""
+    for setter_name, args in operations:
+        try:
+            getattr(apply_object, setter_name)(*args)
+        except TypeError as error:
+            raise ValueError(
+                "Failed setting {} with {}: {}".format(setter_name, args, error)
+            )
+
+
+def compile_config(config: dict, hist: "ROOT.TH1") -> CompiledConfig:
+    """Returns compiled config for histograms of the same class as hist.
+
+    Note:
+        Compiled configs are cached by config content hash and histogram class,
+    so all histograms sharing a config reuse the same CompiledConfig.
+    Sections other than hist/x_axis/y_axis/z_axis are ignored with a warning.
+
+    Raises:
+        ValueError: if a setter doesn't exist or has too many arguments.
+
+    """
+    fingerprint = get_config_fingerprint(config)
+    hist_class = type(hist)
+    cache_key = (fingerprint, hist_class)
+    compiled = _compiled_configs.get(cache_key)
+    if compiled is not None:
+        _compiled_configs.move_to_end(cache_key)
+        return compiled
+    sections = collections.OrderedDict()
+    for section, section_config in config.items():
+        if section not in SECTION_GETTERS:
+            warnings.warn("Unsupported config section ignored: {}".format(section))
+            continue
+        getter = SECTION_GETTERS[section]
+        if getter is None:
+            object_class = hist_class
+        else:
+            object_class = type(getattr(hist, getter)())
+        sections[section] = [
+            compile_setter(object_class, config_name, config_value)
+            for config_name, config_value in section_config.items()
+        ]
+    compiled = CompiledConfig(fingerprint, sections)
+    _compiled_configs[cache_key] = compiled
+    if len(_compiled_configs) > MAX_CACHED_CONFIGS:
+        _compiled_configs.popitem(last=False)
+    return compiled
+
+
+def compile_setter(
+    object_class: type, config_name: str, config_value
+) -> Tuple[str, tuple]:
+    """Returns (setter name, arguments) operation for a single config item.
+
+    Note:
+        List values are expanded to positional arguments, other values are
+    passed as the only argument.
+
+    """
+    if type(config_value) is list:
+        args = tuple(config_value)
+    else:
+        args = (config_value,)
+    if len(args) > MAX_SETTER_ARGS:
+        raise ValueError("Too many arguments for {}: {}".format(config_name, len(args)))
+    _check_setter(object_class, config_name)
+    return config_name, args
+
+
+def get_config_fingerprint(config: dict) -> str:
+    """Returns content hash of the config."""
+    config_json = json.dumps(config, sort_keys=True, default=repr)
+    return hashlib.sha1(config_json.encode("utf-8")).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _check_setter(object_class: type, config_name: str) -> None:
+    """Checks setter exists on the class, raises ValueError if invalid."""
+    setter = getattr(object_class, config_name, None)
+    if setter is None or not callable(setter):
+        raise ValueError(
+            "Invalid setter for {}: {}".format(object_class.__name__, config_name)
+        )
@@ -1,23 +1,52 @@
+from __future__ import annotations
+
 import copy
 import json
 import math
 import os
 import warnings
-from typing import Dict, List, Union
-
-import ROOT
-from HEPTools.plot_utils import plot_utils
+from typing import Callable, Dict, Iterable, List, Union
+
+import numpy as np
+from HEPTools.plot_utils import (
+    bin_stats,
+    canvas_pool,
+    fill_engine,
+    hist_array,
+    merge_engine,
+    plot_utils,
+    profiling,
+    render_cache,
+    style_config,
+    variations,
+)
+from HEPTools.plot_utils.lazy_root import ROOT
 
 Cfg_Dict = Dict[str, Union[int, float, str, Dict[str, Union[int, float, str]]]]
 
-
-class HistCollection(object):
+# number of entries handed to ROOT per FillN call, must fit in Int_t
+FILL_CHUNK_SIZE = 1 << 20
+SUPPORTED_BACKENDS = ["root", "numpy"]
+# config items of numerators copied to their ratios in MultiRatioPlot
+RATIO_STYLE_SETTERS = [
+    "SetLineColor",
+    "SetLineStyle",
+    "SetLineWidth",
+    "SetMarkerColor",
+    "SetMarkerSize",
+    "SetMarkerStyle",
+]
+
+
+class HistCollection(render_cache.RenderMixin):
     """Collection of histograms.
 
     A class to handle ROOT histograms collection plotting easily. 
 
     """
 
+    _default_save_dir = "hist_cols"
+
     def __init__(
         self,
         hist_list: List["TH1Tool"],
@@ -25,25 +54,52 @@ class HistCollection(object):
         title: str = "hist collection",
         create_new_canvas: bool = False,
         canvas: Union[ROOT.TCanvas, None] = None,
+        copy_hists: bool = True,
     ) -> None:
-        """Inits HistCollection with a list of TH1Tool objects."""
+        """Inits HistCollection with a list of TH1Tool objects.
+
+        Note:
+            If copy_hists is False, copy-on-write views of the input histograms
+        are kept instead of deep copies, see TH1Tool.get_view(). draw() sets
+        the style of every member, which clones it, so views only save copies
+        for collections that are not drawn (bin stats, rebinning, caching...).
+            Without canvas, a canvas is taken from the canvas pool when first
+        drawn, unless create_new_canvas is True.
+
+        """
         self._canvas = canvas
         self._name = name
         self._title = title
         self._hist_list = []
+        self._bin_stats = None
+        self._bin_stats_key = None
         for hist in hist_list:
-            self._hist_list.append(copy.deepcopy(hist))
+            if copy_hists:
+                self._hist_list.append(copy.deepcopy(hist))
+            else:
+                self._hist_list.append(hist.get_view())
         if type(hist_list) is not list:
             ValueError("Invalid hist_list type.")
         if len(hist_list) < 1:
             ValueError("Empty hist_list.")
-        if create_new_canvas or (canvas is None):
+        if create_new_canvas:
             self.create_canvas()
 
+    @property
+    def name(self) -> str:
+        """Returns name of the collection."""
+        return self._name
+
+    @property
+    def title(self) -> str:
+        """Returns title of the collection."""
+        return self._title
+
     def create_canvas(self) -> None:
-        """Creats new canvas for drawing."""
-        self._canvas = ROOT.TCanvas(self._name + "_col", self._title + "_col", 800, 600)
+        """Gets a cleared canvas for drawing from the canvas pool."""
+        self._canvas = canvas_pool.get_canvas_pool().acquire(self._title + "_col")
 
+    @profiling.profiled("draw")
     def draw(
         self,
         draw_options: str = "",
@@ -68,30 +124,27 @@ class HistCollection(object):
                 this value.
 
         """
+        if self._canvas is None:
+            self.create_canvas()
         self._canvas.cd()
-        maximum_height = -1e10
-        x_min_use = math.inf
-        x_max_use = -math.inf
-        for hist in self._hist_list:
+        stats = self.get_bin_stats()
+        # find non-zero-bin range along x axis and highest value along y axis
+        x_min_use, x_max_use = stats.get_range(normalized=draw_norm)
+        maximum_height = stats.get_maximum(normalized=draw_norm)
+        if draw_norm:
+            maximum_height *= norm_factor
+        for hist, total_weight, unit_factor in zip(
+            self._hist_list, stats.integrals, stats.norm_factors
+        ):
+            # styling and normalizing modify histograms, clone shared ones
+            hist.detach()
             # set stats 0
             hist.get_hist().SetStats(0)
             #
             if draw_norm:
                 hist.update_config("y_axis", "SetTitle", "")
-                total_weight = hist.get_hist().Integral("width")
                 if total_weight != 0:
-                    hist.get_hist().Scale(1 / total_weight)
-            # find non-zero-bin range along x axis
-            x_min = hist.get_hist().FindFirstBinAbove(0)
-            x_max = hist.get_hist().FindLastBinAbove(0)
-            if x_min < x_min_use:
-                x_min_use = x_min
-            if x_max > x_max_use:
-                x_max_use = x_max
-            # find highest value along y axis
-            current_height = hist.get_hist().GetMaximum()
-            if current_height > maximum_height:
-                maximum_height = current_height
+                    hist.scale(norm_factor * unit_factor)
             hist.set_canvas(self._canvas)
             hist.draw(draw_options + "same")
         if x_min_use - 1 > 0:
@@ -101,39 +154,214 @@ class HistCollection(object):
         if remove_empty_ends:
             self._hist_list[0].get_hist().GetXaxis().SetRange(x_min_use, x_max_use)
         self._hist_list[0].get_hist().GetYaxis().SetRangeUser(0, maximum_height * 1.4)
-        self._canvas.BuildLegend(
-            legend_paras[0],
-            legend_paras[1],
-            legend_paras[2],
-            legend_paras[3],
-            legend_title,
-        )
+        with profiling.phase("build_legend", self._name):
+            self._canvas.BuildLegend(
+                legend_paras[0],
+                legend_paras[1],
+                legend_paras[2],
+                legend_paras[3],
+                legend_title,
+            )
         self._hist_list[0].get_hist().SetTitle(self._name)
         self._canvas.Update()
 
+    def get_bin_stats(self) -> bin_stats.BinStats:
+        """Returns bin statistics of the histograms in the collection.
+
+        Note:
+            The statistics are cached until a histogram of the collection is
+        modified, see TH1Tool.get_version().
+
+        """
+        key = tuple((id(hist), hist.get_version()) for hist in self._hist_list)
+        if key != self._bin_stats_key:
+            self._bin_stats = bin_stats.BinStats(
+                [hist.get_hist_array() for hist in self._hist_list]
+            )
+            self._bin_stats_key = key
+        return self._bin_stats
+
+    def get_hist_list(self) -> list:
+        """Returns histograms in the collection."""
+        return self._hist_list
+
+    def rebin(self, new_edges: np.ndarray, axis_id: int = 0) -> None:
+        """Rebins all histograms onto new bin edges, see TH1Tool.rebin.
+
+        Note:
+            Histograms with the same binning are rebinned together in one
+        vectorized step, see hist_array.rebin_many.
+
+        """
+        _rebin_hists(self._hist_list, new_edges, axis_id)
+
+    def release_canvas(self) -> None:
+        """Gives the canvas back to the canvas pool if it comes from there.
+
+        Note:
+            Members drawn on the released canvas stop referencing it.
+
+        """
+        canvas = self._canvas
+        if canvas_pool.get_canvas_pool().release(canvas):
+            self._canvas = None
+            for hist in self._hist_list:
+                if hist.get_canvas() is canvas:
+                    hist.set_canvas(None)
+
     def save(
         self,
         save_dir: Union[str, None] = None,
         save_file_name: str = None,
         save_format: str = "png",
+        release_canvas: bool = False,
     ) -> None:
         """Saves the plot on canvas to file.
 
         The plot will be saved to 'save_dir/save_file_name.save_format'.
+        If release_canvas is True, a canvas from the canvas pool is given back
+        to the pool after saving, draw again before using the plot again.
 
         """
-        if save_dir is None:
-            save_dir = os.getcwd() + "/hist_cols"
-        else:
-            if not os.path.isabs(save_dir):
-                save_dir = "./" + save_dir
-        if save_file_name is None:
-            save_file_name = self._name
+        save_path = self.get_save_path(save_dir, save_file_name, save_format)
+        save_dir = os.path.dirname(save_path)
         if not os.path.exists(save_dir):
             print("save_dir:", save_dir)
             os.makedirs(save_dir)
-        save_path = save_dir + "/" + save_file_name + "." + save_format
         self._canvas.SaveAs(save_path)
+        if release_canvas:
+            self.release_canvas()
+
+
+class MultiRatioPlot(object):
+    """Ratio plot of many numerators against one denominator.
+
+    A class to draw the ratios of N numerator histograms to one denominator
+    histogram, together with the denominator relative error band, in one pad.
+
+    Note:
+        Input histograms are not copied. The ratios are computed from the bin
+    arrays in one vectorized pass (see hist_array.divide_many), so only N + 1
+    histograms are created (ratios and error band).
+        Line/marker style of each ratio is taken from the "hist" section of the
+    numerator config.
+
+    """
+
+    def __init__(
+        self,
+        hist_numerators: List["TH1Tool"],
+        hist_denominator: "TH1Tool",
+        name: str = "hist ratios",
+        title: str = "hist ratios",
+        x_title: str = "var",
+        y_title: str = "ratio",
+        create_new_canvas: bool = False,
+        canvas: Union[ROOT.TCanvas, None] = None,
+        canvas_id: int = 1,
+    ) -> None:
+        """Inits MultiRatioPlot with numerator list and denominator histogram."""
+        if len(hist_numerators) < 1:
+            raise ValueError("Empty hist_numerators.")
+        self._canvas = canvas
+        self._canvas_id = canvas_id
+        self.name = name
+        self.title = title
+        self.x_title = x_title
+        self.y_title = y_title
+        denominator_array = hist_denominator.get_hist_array()
+        ratio_arrays = hist_array.divide_many(
+            [hist.get_hist_array() for hist in hist_numerators], denominator_array
+        )
+        self._hist_ratios = []
+        for hist, ratio_array in zip(hist_numerators, ratio_arrays):
+            ratio_config = {"hist": {"SetStats": 0}}
+            for config_name, config_value in hist.config.get("hist", {}).items():
+                if config_name in RATIO_STYLE_SETTERS:
+                    ratio_config["hist"][config_name] = config_value
+            hist_ratio = TH1Tool(
+                hist.name + "_ratio", hist.title, config=ratio_config, backend="numpy"
+            )
+            hist_ratio.set_hist_array(ratio_array)
+            self._hist_ratios.append(hist_ratio)
+        self._hist_ratio_err = TH1Tool(name + "_err", title, backend="numpy")
+        self._hist_ratio_err.set_hist_array(denominator_array.get_relative_error_band())
+        self.style_cfg = RatioPlot.get_style_config(self.x_title, self.y_title)
+        self._base_line = None
+        if create_new_canvas or (canvas is None):
+            self.create_canvas()
+
+    def create_canvas(self) -> None:
+        """Gets a cleared canvas for drawing from the canvas pool."""
+        self._canvas = canvas_pool.get_canvas_pool().acquire(self.title + "_ratios")
+        self._canvas_id = 0
+
+    @profiling.profiled("draw")
+    def draw(self, draw_options: str = "e3", ratio_draw_options: str = "") -> None:
+        """Plots error band, base line and all ratios in the same pad.
+
+        Args:
+
+            draw_options: Options applied when drawing the error band.
+            ratio_draw_options: Options applied when drawing each ratio.
+
+        """
+        if self._canvas is None:
+            self.create_canvas()
+        self._canvas.cd(self._canvas_id)
+        # plot denominator relative error band
+        self._hist_ratio_err.set_config(self.style_cfg)
+        self._hist_ratio_err.apply_config()
+        err_hist = self._hist_ratio_err.get_hist()
+        err_hist.Draw(draw_options)
+        # plot base line over the whole axis, created once
+        if self._base_line is None:
+            x_axis = err_hist.GetXaxis()
+            self._base_line = ROOT.TF1(
+                self.name + "_one", "1", x_axis.GetXmin(), x_axis.GetXmax()
+            )
+            self._base_line.SetLineColor(ROOT.kRed)
+        self._base_line.Draw("same")
+        # plot ratios
+        for hist_ratio in self._hist_ratios:
+            hist_ratio.apply_config()
+            hist_ratio.get_hist().Draw(ratio_draw_options + "same")
+        self._canvas.Update()
+
+    def get_canvas(self) -> ROOT.TCanvas:
+        """Returns the ROOT canvas in use."""
+        return self._canvas
+
+    def get_hist_ratio_err(self) -> "TH1Tool":
+        """Returns the denominator relative error band."""
+        return self._hist_ratio_err
+
+    def get_hist_ratios(self) -> List["TH1Tool"]:
+        """Returns ratio histograms, in numerator order."""
+        return self._hist_ratios
+
+    def release_canvas(self) -> None:
+        """Gives the canvas back to the canvas pool if it comes from there."""
+        if canvas_pool.get_canvas_pool().release(self._canvas):
+            self._canvas = None
+
+    def set_band(
+        self,
+        band: Union[variations.VariationBundle, hist_array.HistArray],
+        method: str = "quadrature",
+        include_stat: bool = True,
+    ) -> None:
+        """Replaces the denominator statistical error band.
+
+        Note:
+            band is a variations.VariationBundle of the denominator (its
+        relative band is used, see VariationBundle.get_relative_band) or an
+        already relative hist_array.HistArray band.
+
+        """
+        self._hist_ratio_err = _get_band_tool(
+            band, self.name + "_err", self.title, True, method, include_stat
+        )
 
 
 class RatioPlot(object):
@@ -153,22 +381,67 @@ class RatioPlot(object):
         y_title: str = "data/bkg",
         create_new_canvas: bool = False,
         canvas: Union[ROOT.TCanvas, None] = None,
+        copy_hists: bool = True,
     ) -> None:
-        """Inits RatioPlot with numerator/denominator histograms."""
+        """Inits RatioPlot with numerator/denominator histograms.
+
+        Note:
+            If copy_hists is False, numerator/denominator are kept as
+        copy-on-write views and only the two ratio histograms are cloned.
+
+        """
         self._canvas = canvas
         self.name = name
         self.title = title
         self.x_title = x_title
         self.y_title = y_title
-        self._hist_numerator = copy.deepcopy(hist_numerator)
-        self._hist_denominator = copy.deepcopy(hist_denominator)
-        self._hist_ratio = copy.deepcopy(hist_numerator)
-        self._hist_ratio.get_hist().Divide(self._hist_denominator.get_hist())
-        self._hist_ratio_err = copy.deepcopy(hist_denominator)
-        self._hist_ratio_err.get_hist().Divide(self._hist_denominator.get_hist())
+        if copy_hists:
+            self._hist_numerator = copy.deepcopy(hist_numerator)
+            self._hist_denominator = copy.deepcopy(hist_denominator)
+        else:
+            self._hist_numerator = hist_numerator.get_view()
+            self._hist_denominator = hist_denominator.get_view()
+        self._hist_ratio = self._hist_numerator.get_view()
+        self._hist_ratio.divide(self._hist_denominator)
+        self._hist_ratio_err = self._hist_denominator.get_view()
+        self._hist_ratio_err.divide(self._hist_denominator)
         if create_new_canvas or (canvas is None):
             self.create_canvas()
-        self.style_cfg = {
+        self.style_cfg = RatioPlot.get_style_config(self.x_title, self.y_title)
+        self._base_line = None
+
+    def create_canvas(self) -> None:
+        """Gets a cleared canvas for drawing from the canvas pool."""
+        self._canvas = canvas_pool.get_canvas_pool().acquire(self.title + "_ratio")
+
+    @profiling.profiled("draw")
+    def draw(self, draw_options: str = "e3"):
+        """Plots HistCollection on canvas.
+
+        Args:
+
+            draw_options: Options applied when calling draw function in ROOT.
+
+        """
+        if self._canvas is None:
+            self.create_canvas()
+        self._canvas.cd()
+        # plot bkg error bar
+        self._hist_ratio_err.set_config(self.style_cfg)
+        self._hist_ratio_err.apply_config()
+        self._hist_ratio_err.get_hist().Draw(draw_options)
+        # plot base line, created once
+        if self._base_line is None:
+            self._base_line = ROOT.TF1("one", "1", 0, 1)
+            self._base_line.SetLineColor(ROOT.kRed)
+        self._base_line.Draw("same")
+        # plot ratio
+        self._hist_ratio.get_hist().Draw("same")
+
+    @staticmethod
+    def get_style_config(x_title: str, y_title: str) -> Cfg_Dict:
+        """Returns default config of the ratio error band and axes."""
+        return {
             "hist": {
                 "SetDefaultSumw2": True,
                 "SetMinimum": 0.5,
@@ -178,7 +451,7 @@ class RatioPlot(object):
                 "SetFillColor": ROOT.kGray,
             },
             "x_axis": {
-                "SetTitle": self.x_title,
+                "SetTitle": x_title,
                 "SetTitleSize": 20,
                 "SetTitleFont": 43,
                 "SetTitleOffset": 4.0,
@@ -186,7 +459,7 @@ class RatioPlot(object):
                 "SetLabelSize": 15,
             },
             "y_axis": {
-                "SetTitle": self.y_title,
+                "SetTitle": y_title,
                 "SetNdivisions": 505,
                 "SetTitleSize": 0.04,
                 "SetTitleFont": 43,
@@ -196,34 +469,30 @@ class RatioPlot(object):
             },
         }
 
-    def create_canvas(self) -> None:
-        """Creats new canvas for drawing."""
-        self._canvas = ROOT.TCanvas(
-            self.name + "_ratio", self.title + "_ratio", 800, 600
-        )
+    def release_canvas(self) -> None:
+        """Gives the canvas back to the canvas pool if it comes from there."""
+        if canvas_pool.get_canvas_pool().release(self._canvas):
+            self._canvas = None
 
-    def draw(self, draw_options: str = "e3"):
-        """Plots HistCollection on canvas.
-
-        Args:
+    def set_band(
+        self,
+        band: Union[variations.VariationBundle, hist_array.HistArray],
+        method: str = "quadrature",
+        include_stat: bool = True,
+    ) -> None:
+        """Replaces the denominator statistical error band.
 
-            draw_options: Options applied when calling draw function in ROOT.
+        Note:
+            band is a variations.VariationBundle of the denominator or an
+        already relative hist_array.HistArray band, see MultiRatioPlot.set_band.
 
         """
-        self._canvas.cd()
-        # plot bkg error bar
-        self._hist_ratio_err.set_config(self.style_cfg)
-        self._hist_ratio_err.apply_config()
-        self._hist_ratio_err.get_hist().Draw(draw_options)
-        # plot base line
-        base_line = ROOT.TF1("one", "1", 0, 1)
-        base_line.SetLineColor(ROOT.kRed)
-        base_line.Draw("same")
-        # plot ratio
-        self._hist_ratio.get_hist().Draw("same")
+        self._hist_ratio_err = _get_band_tool(
+            band, self.name + "_err", self.title, True, method, include_stat
+        )
 
 
-class TH1Tool(object):
+class TH1Tool(render_cache.RenderMixin):
     """ROOT TH1 class wrapper for easy handling.
 
     Note:
@@ -231,6 +500,8 @@ class TH1Tool(object):
 
     """
 
+    _default_save_dir = "hists"
+
     def __init__(
         self,
         name: str,
@@ -239,11 +510,16 @@ class TH1Tool(object):
         create_new_canvas: "bool" = False,
         canvas: "TCanvas" = None,
         canvas_id: int = 1,
+        backend: str = "root",
     ) -> None:
         """Inits TH1Tool.
 
         Note:
             canvas_id starts from 1
+            backend "root" stores the histogram in a ROOT TH1 from the start,
+        backend "numpy" stores it in a hist_array.HistArray and creates the ROOT
+        TH1 only when get_hist() is called (e.g. by draw()). Once created, the
+        ROOT TH1 becomes the storage.
 
         Cfgs:
             config: configurations and operations for plotting. example:
@@ -262,7 +538,14 @@ class TH1Tool(object):
             }
 
         """
+        if backend not in SUPPORTED_BACKENDS:
+            raise ValueError("Unsupported backend: {}".format(backend))
+        self._backend = backend
         self._hist = None
+        self._array = None
+        self._shared = False
+        # content version, shared with views as long as the storage is
+        self._version = [0]
         self.name = name
         self.title = title
         self._canvas = canvas
@@ -278,66 +561,80 @@ class TH1Tool(object):
         memo[id(self)] = retrun_obj
         for key, value in self.__dict__.items():
             if key == "_hist":
-                setattr(retrun_obj, "_hist", self._hist.Clone())
-            elif key == "canvas":
-                setattr(retrun_obj, "canvas", None)
+                if self._hist is None:
+                    setattr(retrun_obj, "_hist", None)
+                else:
+                    setattr(retrun_obj, "_hist", self._hist.Clone())
+            elif key == "_shared":
+                setattr(retrun_obj, "_shared", False)
+            elif key == "_canvas":
+                # canvases are not copied, they may belong to the canvas pool
+                setattr(retrun_obj, "_canvas", None)
             else:
                 setattr(retrun_obj, key, copy.deepcopy(value, memo))
         return retrun_obj
 
+    def add(self, other: "TH1Tool", scale: float = 1.0) -> None:
+        """Adds other histogram (times scale) to this one.
+
+        Note:
+            Done in numpy if this histogram is array-backed, otherwise with
+        TH1::Add.
+
+        """
+        self.detach()
+        self._update_version()
+        if self._array is not None:
+            self._array.add(other.get_hist_array(), scale)
+        elif other._hist is None and other._array is not None:
+            self._hist.Add(other._array.to_root(other.name + "_add", other.title), scale)
+        else:
+            self._hist.Add(other.get_hist(), scale)
+
+    @profiling.profiled("apply_config")
     def apply_config(self) -> None:
         """Applys config associate with TH1Tool object.
 
         Note:
         When Draw() function called, if self._config_applied is False.
         This function will be called automatically before make plot.
+        The config is compiled once per content and histogram class (see
+        style_config.compile_config) and shared by all histograms using it.
 
         """
-        config = self.config
-        for section in config:
-            if section == "hist":
-                config_hist = config["hist"]
-                self.apply_config_hist(config_hist)
-            elif section == "x_axis":
-                config_x_axis = config["x_axis"]
-                self.apply_config_x_axis(config_x_axis)
-            elif section == "y_axis":
-                config_y_axis = config["y_axis"]
-                self.apply_config_y_axis(config_y_axis)
-            elif section == "z_axis":
-                config_z_axis = config["z_axis"]
-                self.apply_config_z_axis(config_z_axis)
-            else:
-                ValueError(
-                    "Unsupported config section. Please change your config or add support."
-                )
+        self.detach()
+        hist = self.get_hist()
+        style_config.compile_config(self.config, hist).apply(hist)
         self._config_applied = True
 
     def apply_config_hist(self, config: Cfg_Dict) -> None:
         """Applys general hist config."""
-        for item in config:
-            self.apply_single_config(self._hist, "hist", item)
+        self.detach()
+        hist = self.get_hist()
+        style_config.compile_config({"hist": config}, hist).apply(hist)
 
     def apply_config_axis(
         self, axis: ROOT.TAxis, axis_section: str, config: Cfg_Dict
     ) -> None:
         """Applys axis config."""
-        for item in config:
-            self.apply_single_config(axis, axis_section, item)
+        self.detach()
+        style_config.compile_config(
+            {axis_section: config}, self.get_hist()
+        ).apply_section(axis_section, axis)
 
     def apply_config_x_axis(self, config: Cfg_Dict) -> None:
         """Applys x axis config."""
-        x_axis = self._hist.GetXaxis()
+        x_axis = self.get_hist().GetXaxis()
         self.apply_config_axis(x_axis, "x_axis", config)
 
     def apply_config_y_axis(self, config: Cfg_Dict) -> None:
         """Applys y axis config."""
-        y_axis = self._hist.GetYaxis()
+        y_axis = self.get_hist().GetYaxis()
         self.apply_config_axis(y_axis, "y_axis", config)
 
     def apply_config_z_axis(self, config: Cfg_Dict) -> None:
         """Applys z axis config."""
-        z_axis = self._hist.GetZaxis()
+        z_axis = self.get_hist().GetZaxis()
         self.apply_config_axis(z_axis, "z_axis", config)
 
     def apply_single_config(
@@ -346,47 +643,19 @@ class TH1Tool(object):
         section_name: str,
         config_name: str,
     ) -> None:
-        """Applys single config with mutable quantity inputs."""
+        """Applys single config with mutable quantity inputs.
+
+        Raises:
+            ValueError: if the setter is invalid or fails.
+
+        """
         config_value = self.config[section_name][config_name]
-        if type(config_value) is list:
-            num_config_value = len(config_value)
-        else:
-            num_config_value = 1
-        try:
-            if num_config_value == 1:
-                getattr(apply_object, config_name)(config_value)
-            elif num_config_value == 2:
-                getattr(apply_object, config_name)(config_value[0], config_value[1])
-            elif num_config_value == 3:
-                getattr(apply_object, config_name)(
-                    config_value[0], config_value[1], config_value[2]
-                )
-            elif num_config_value == 4:
-                getattr(apply_object, config_name)(
-                    config_value[0], config_value[1], config_value[2], config_value[3]
-                )
-            elif num_config_value == 5:
-                getattr(apply_object, config_name)(
-                    config_value[0],
-                    config_value[1],
-                    config_value[2],
-                    config_value[3],
-                    config_value[4],
-                )
-            elif num_config_value == 6:
-                getattr(apply_object, config_name)(
-                    config_value[0],
-                    config_value[1],
-                    config_value[2],
-                    config_value[3],
-                    config_value[4],
-                    config_value[5],
-                )
-            else:
-                ValueError("Invalid num_config_value.")
-        except:
-            ValueError("Failed setting for:", config_name)
+        operation = style_config.compile_setter(
+            type(apply_object), config_name, config_value
+        )
+        style_config.apply_operations(apply_object, [operation])
 
+    @profiling.profiled("build_legend")
     def build_legend(
         self, x1: float = 0.8, y1: float = 0.75, x2: float = 0.9, y2: float = 0.9
     ) -> None:
@@ -401,10 +670,37 @@ class TH1Tool(object):
         self._canvas.Update()
 
     def create_canvas(self) -> None:
-        """Creats new canvas for drawing."""
-        self._canvas = ROOT.TCanvas(self.name + "_th1", self.title + "_th1", 800, 600)
+        """Gets a cleared canvas for drawing from the canvas pool."""
+        self._canvas = canvas_pool.get_canvas_pool().acquire(self.title + "_th1")
         self._canvas_id = 0
 
+    def detach(self) -> None:
+        """Clones the shared histogram and config of a copy-on-write view.
+
+        Note:
+            Does nothing if the object is not a view, see get_view().
+
+        """
+        if not self._shared:
+            return
+        if self._hist is not None:
+            self._hist = self._hist.Clone()
+        if self._array is not None:
+            self._array = self._array.copy()
+        self.config = copy.deepcopy(self.config)
+        self._version = [self._version[0]]
+        self._shared = False
+
+    def divide(self, other: "TH1Tool") -> None:
+        """Divides by other histogram bin by bin, as TH1::Divide does."""
+        self.detach()
+        self._update_version()
+        if self._array is not None:
+            self._array.divide(other.get_hist_array())
+        else:
+            self._hist.Divide(other.get_hist())
+
+    @profiling.profiled("draw")
     def draw(self, draw_options: str = "", log_scale=False) -> None:
         """Makes the plot.
 
@@ -425,18 +721,112 @@ class TH1Tool(object):
             self.apply_config()
         if log_scale:
             self._canvas.SetLogy(2)
-        self._hist.Draw(draw_options)
+        self.get_hist().Draw(draw_options)
         self._canvas.Update()
 
-    def fill_hist(self, fill_array, weight_array=None):
-        """Fills the histogram with array."""
+    @profiling.profiled("fill")
+    def fill_hist(
+        self,
+        fill_array,
+        weight_array=None,
+        chunk_size: int = FILL_CHUNK_SIZE,
+        max_memory: Union[int, None] = None,
+        progress: Union[Callable[[int, Union[int, None]], None], None] = None,
+        workers: Union[int, None] = 1,
+    ) -> None:
+        """Fills the histogram with array.
+
+        Note:
+            Inputs exposing the buffer protocol (numpy arrays, np.memmap,
+        array.array, memoryview...) are handed to ROOT through FillN in
+        contiguous blocks of chunk_size entries without per-element python
+        objects. Contiguous float64 inputs are not copied. Other iterables are
+        filled entry by entry.
+            Inputs can also be paths of .npy files, which are memory-mapped, or
+        chunk iterators (e.g. generators yielding arrays), which are re-cut into
+        the same blocks, see plot_utils.open_fill_inputs. max_memory (bytes)
+        lowers chunk_size to bound the fill buffers, see
+        plot_utils.get_fill_chunk_size. progress is called after each block
+        with (entries filled, total entries or None), e.g.
+        plot_utils.print_progress.
+            Array-backed histograms are filled with numpy in the same blocks,
+        summed in fixed units (see hist_array.HistArray.fill_bins). ROOT-backed
+        results don't depend on chunk_size, array-backed results are
+        bit-identical for any chunk_size from hist_array.FILL_UNIT_SIZE up,
+        whatever max_memory and input chunking.
+            If workers is not 1 (None means one per core), blocks are filled
+        into partial histograms by worker threads and added in block order,
+        see fill_engine.iter_partials. Block boundaries don't depend on
+        workers, max_memory caps the number of blocks in flight instead, so
+        array-backed results are the same as with workers=1. ROOT-backed
+        histograms get the partials added through TH1::Add, so results may
+        differ from FillN by rounding, but are reproducible.
+
+        """
+        self.detach()
+        self._update_version()
+        arrays = [fill_array]
+        if weight_array is not None:
+            arrays.append(weight_array)
+        arrays, chunked = plot_utils.open_fill_inputs(arrays)
+        if self._fill_blocks(
+            arrays, chunked, 1, chunk_size, max_memory, progress, workers
+        ):
+            return
         if weight_array is None:
-            for element in fill_array:
+            for element in arrays[0]:
                 self._hist.Fill(element)
         else:
-            for element, weight in zip(fill_array, weight_array):
+            for element, weight in zip(arrays[0], arrays[1]):
                 self._hist.Fill(element, weight)
 
+    def fill_hist_auto_range(
+        self,
+        fill_chunks: Iterable,
+        weight_chunks: Union[Iterable, None] = None,
+        buffer_size: int = 100000,
+        chunk_size: int = FILL_CHUNK_SIZE,
+    ) -> None:
+        """Fills 1D histogram from chunks of data, choosing the bin range on the fly.
+
+        Note:
+            The first buffer_size entries are buffered to choose the range the
+        same way as reinitial_hist_with_fill_array, then the histogram is
+        recreated and all chunks are filled directly. Entries falling out of the
+        range extend the axis by doubling it and merging bins (the number of
+        bins is kept), so the whole input never needs to be in memory.
+
+        """
+        if weight_chunks is not None:
+            weight_chunks = iter(weight_chunks)
+        buffered_fill = []
+        buffered_weight = []
+        num_buffered = 0
+        range_chosen = False
+        for fill_chunk in fill_chunks:
+            weight_chunk = None
+            if weight_chunks is not None:
+                weight_chunk = next(weight_chunks)
+            if range_chosen:
+                self._fill_hist_extend(fill_chunk, weight_chunk, chunk_size)
+                continue
+            fill_chunk = plot_utils.as_arrays([fill_chunk])[0]
+            if weight_chunk is not None:
+                weight_chunk = plot_utils.as_arrays([weight_chunk])[0]
+            buffered_fill.append(fill_chunk)
+            buffered_weight.append(weight_chunk)
+            num_buffered += len(fill_chunk)
+            if num_buffered >= buffer_size:
+                self._fill_hist_buffered(buffered_fill, buffered_weight, chunk_size)
+                buffered_fill = []
+                buffered_weight = []
+                range_chosen = True
+        if not range_chosen and num_buffered > 0:
+            self._fill_hist_buffered(buffered_fill, buffered_weight, chunk_size)
+            range_chosen = True
+        if range_chosen and self._hist is not None:
+            self._hist.SetCanExtend(ROOT.TH1.kNoAxis)
+
     def get_canvas(self) -> ROOT.TCanvas:
         """Returns the ROOT canvas in use."""
         return self._canvas
@@ -446,9 +836,66 @@ class TH1Tool(object):
         return self.config
 
     def get_hist(self) -> ROOT.TH1:
-        """Returns the ROOT TH1 object."""
+        """Returns the ROOT TH1 object.
+
+        Note:
+            For array-backed histograms, the ROOT TH1 is created from the arrays
+        at the first call and replaces them as storage.
+
+        """
+        if self._hist is None and self._array is not None:
+            self._hist = self._array.to_root(self.name, self.title)
+            self._array = None
         return self._hist
 
+    def get_hist_array(self) -> hist_array.HistArray:
+        """Returns the histogram numerics as hist_array.HistArray.
+
+        Note:
+            For ROOT-backed histograms, the returned arrays are views on the ROOT
+        histogram memory.
+
+        """
+        if self._array is not None:
+            return self._array
+        return hist_array.HistArray.from_root(self._hist)
+
+    def get_version(self) -> int:
+        """Returns version of the histogram contents.
+
+        Note:
+            The version changes whenever the contents are modified through this
+        object (fill, scale, add, divide, set_hist...). Changes made directly on
+        the ROOT object from get_hist() are not tracked.
+
+        """
+        return self._version[0]
+
+    def get_view(self) -> "TH1Tool":
+        """Returns a copy-on-write view of this object.
+
+        Note:
+            The view shares the histogram storage and config with this object
+        until an operation of the view would modify them (fill, scale, divide,
+        config update or first apply...), then they are cloned for the view.
+        Drawing alone doesn't clone. Changes made directly on the ROOT object
+        from get_hist() are not tracked.
+
+        """
+        view = copy.copy(self)
+        view._shared = True
+        return view
+
+    def integral(self, option: str = "") -> float:
+        """Returns integral of in-range bins, option "width" as in TH1::Integral."""
+        if self._array is not None:
+            return self._array.integral(option)
+        return self._hist.Integral(option)
+
+    def is_view(self) -> bool:
+        """Checks whether the object still shares its histogram with another."""
+        return self._shared
+
     def parse_config(self, config: Union[str, Cfg_Dict]) -> Cfg_Dict:
         """Reads json config.
 
@@ -466,24 +913,53 @@ class TH1Tool(object):
         else:
             ValueError("Unsupported config input type.")
 
+    def rebin(self, new_edges: np.ndarray, axis_id: int = 0) -> None:
+        """Merges bins of an axis into new, possibly variable width, bins.
+
+        Note:
+            new_edges must be a subset of the current bin edges, see
+        hist_array.rebin_many. The histogram becomes array-backed, its config
+        is kept, and binning attributes (nbin, xlow, xup...) are updated.
+
+        """
+        self.set_hist_array(self.get_hist_array().rebin(new_edges, axis_id))
+        self._update_binning_attributes(axis_id)
+
+    def release_canvas(self) -> None:
+        """Gives the canvas back to the canvas pool if it comes from there."""
+        if canvas_pool.get_canvas_pool().release(self._canvas):
+            self._canvas = None
+
     def save(
         self,
         save_dir: Union[str, None] = None,
         save_file_name: Union[str, None] = None,
         save_format: [str] = "png",
+        release_canvas: bool = False,
     ) -> None:
-        """Saves plots to specified path."""
-        if save_dir is None:
-            save_dir = "./hists"
-        else:
-            if not os.path.isabs(save_dir):
-                save_dir = "./" + save_dir
-        if save_file_name is None:
-            save_file_name = self.name
+        """Saves plots to specified path.
+
+        Note:
+            If release_canvas is True, a canvas from the canvas pool is given
+        back to the pool after saving, draw again before using the plot again.
+
+        """
+        save_path = self.get_save_path(save_dir, save_file_name, save_format)
+        save_dir = os.path.dirname(save_path)
         if not os.path.exists(save_dir):
             os.makedirs(save_dir)
-        save_path = save_dir + "/" + save_file_name + "." + save_format
         self._canvas.SaveAs(save_path)
+        if release_canvas:
+            self.release_canvas()
+
+    def scale(self, factor: float) -> None:
+        """Scales the histogram by factor."""
+        self.detach()
+        self._update_version()
+        if self._array is not None:
+            self._array.scale(factor)
+        else:
+            self._hist.Scale(factor)
 
     def set_canvas(self, canvas: ROOT.TCanvas) -> None:
         """Sets canvas from external."""
@@ -491,12 +967,24 @@ class TH1Tool(object):
 
     def set_config(self, config: Cfg_Dict) -> None:
         """Sets histogram configurations."""
+        self.detach()
         self.config.update(self.parse_config(config))
         self._config_applied = False
 
     def set_hist(self, hist: ROOT.TH1) -> None:
         """Sets hist using external histogram."""
+        self.detach()
+        self._update_version()
         self._hist = hist
+        self._array = None
+
+    def set_hist_array(self, array: hist_array.HistArray) -> None:
+        """Sets array-backed storage using external hist_array.HistArray."""
+        self.detach()
+        self._update_version()
+        self._array = array
+        self._hist = None
+        self._config_applied = False
 
     def set_palette(self, palette: str) -> None:
         ROOT.gStyle.SetPalette(getattr(ROOT, palette))
@@ -511,6 +999,7 @@ class TH1Tool(object):
         If item doesn't exist, value will be created with new value.
 
         """
+        self.detach()
         section_value = {}
         try:
             section_value = self.config[section]
@@ -520,10 +1009,141 @@ class TH1Tool(object):
         self.config.update({section: section_value})
         self._config_applied = False
 
+    def _update_version(self) -> None:
+        """Marks the histogram contents as modified, see get_version()."""
+        self._version[0] += 1
+
+    def _fill_blocks(
+        self,
+        arrays: list,
+        chunked: bool,
+        num_axes: int,
+        chunk_size: int,
+        max_memory: Union[int, None],
+        progress: Union[Callable[[int, Union[int, None]], None], None],
+        workers: Union[int, None] = 1,
+    ) -> bool:
+        """Fills opened inputs block by block, see fill_hist.
+
+        Note:
+            arrays are the coordinates of num_axes axes followed by optional
+        weights. Returns False (nothing filled) if ROOT-backed histogram
+        inputs are plain iterables, which must be filled entry by entry.
+            Block boundaries don't depend on workers. With several workers,
+        max_memory caps the number of blocks in flight instead.
+
+        """
+        workers = fill_engine.get_num_workers(workers)
+        chunk_size = plot_utils.get_fill_chunk_size(len(arrays), chunk_size, max_memory)
+        if chunked:
+            blocks = plot_utils.iter_chunk_blocks(arrays, chunk_size)
+            num_total = None
+        else:
+            if self._array is not None:
+                arrays = plot_utils.as_arrays(arrays)
+            elif not all(plot_utils.has_buffer_protocol(array) for array in arrays):
+                return False
+            blocks = plot_utils.iter_fill_blocks(arrays, chunk_size)
+            num_total = min(len(array) for array in arrays)
+        num_filled = 0
+        if workers > 1:
+            if self._array is not None:
+                total = self._array
+            else:
+                total = hist_array.HistArray.from_root(self._hist).empty_copy()
+            max_in_flight = None
+            if max_memory is not None:
+                block_memory = (
+                    8 * plot_utils.FILL_BLOCK_COPIES * len(arrays) * chunk_size
+                )
+                max_in_flight = max(1, int(max_memory) // block_memory)
+            for partial in fill_engine.iter_partials(
+                total.empty_copy(), blocks, num_axes, workers, max_in_flight
+            ):
+                total.add(partial)
+                num_filled += int(partial.entries)
+                if progress is not None:
+                    progress(num_filled, num_total)
+            if self._array is None:
+                partials_hist = total.to_root(self.name + "_partials", self.title)
+                # keep the temporary histogram out of gDirectory
+                partials_hist.SetDirectory(ROOT.nullptr)
+                self._hist.Add(partials_hist)
+            return True
+        for block in blocks:
+            weights = block[num_axes] if len(block) > num_axes else None
+            if self._array is not None:
+                self._array.fill(*block[:num_axes], weights=weights)
+            elif weights is None:
+                self._hist.FillN(len(block[0]), *block[:num_axes], ROOT.nullptr)
+            else:
+                self._hist.FillN(len(block[0]), *block[:num_axes], weights)
+            num_filled += len(block[0])
+            if progress is not None:
+                progress(num_filled, num_total)
+        return True
+
+    def _fill_hist_buffered(
+        self, fill_chunks: list, weight_chunks: list, chunk_size: int
+    ) -> None:
+        """Recreates 1D histogram with range of buffered chunks and fills them."""
+        self.detach()
+        fill_array = np.concatenate(fill_chunks)
+        self.reinitial_hist_with_fill_array(fill_array)
+        if self._hist is not None:
+            self._hist.SetCanExtend(ROOT.TH1.kAllAxes)
+        weight_array = None
+        if weight_chunks[0] is not None:
+            weight_array = np.concatenate(weight_chunks)
+        self._fill_hist_extend(fill_array, weight_array, chunk_size)
+
+    def _fill_hist_extend(self, fill_array, weight_array, chunk_size: int) -> None:
+        """Fills 1D histogram, extending the axis if entries are out of range."""
+        if self._array is not None:
+            fill_array = plot_utils.as_arrays([fill_array])[0]
+            if len(fill_array) > 0:
+                self._array.extend_axis(0, *plot_utils.get_array_range(fill_array))
+        self.fill_hist(fill_array, weight_array, chunk_size=chunk_size)
+
+    def _create_hist(self, axes: list) -> None:
+        """Creates empty histogram storage with axes given as (nbin, low, up)."""
+        self._update_version()
+        if self._backend == "numpy":
+            self._array = hist_array.HistArray.from_uniform(
+                axes, dtype=self._array_dtype
+            )
+            self._hist = None
+        else:
+            axis_args = [value for axis in axes for value in axis]
+            self._hist = getattr(ROOT, self._root_type)(
+                self.name, self.title, *axis_args
+            )
+            self._array = None
+
+    def _get_render_hists(self) -> List["TH1Tool"]:
+        """Returns histograms fingerprinted by render()."""
+        return [self]
+
+    def _update_binning_attributes(self, axis_id: int) -> None:
+        """Updates nbin/xlow/xup (nbinx/nbiny... for 2D) of an axis if present."""
+        axis_edges = self.get_hist_array().edges[axis_id]
+        axis_name = "xy"[axis_id]
+        nbin_name = "nbin" + axis_name
+        if axis_id == 0 and hasattr(self, "nbin"):
+            nbin_name = "nbin"
+        if not hasattr(self, nbin_name):
+            return
+        setattr(self, nbin_name, len(axis_edges) - 1)
+        setattr(self, axis_name + "low", float(axis_edges[0]))
+        setattr(self, axis_name + "up", float(axis_edges[-1]))
+
 
 class TH1DTool(TH1Tool):
     """ROOT TH1D class wrapper for easy handling."""
 
+    _root_type = "TH1D"
+    _array_dtype = np.float64
+
     def __init__(
         self,
         name: str,
@@ -535,6 +1155,7 @@ class TH1DTool(TH1Tool):
         create_new_canvas: bool = False,
         canvas: Union[ROOT.TCanvas, None] = None,
         canvas_id: int = 1,
+        backend: str = "root",
     ) -> None:
         """Inits TH1DTool"""
         super().__init__(
@@ -544,22 +1165,34 @@ class TH1DTool(TH1Tool):
             create_new_canvas=create_new_canvas,
             canvas=canvas,
             canvas_id=canvas_id,
+            backend=backend,
         )
-        self._hist = ROOT.TH1D(name, title, nbin, xlow, xup)
         self.nbin = nbin
         self.xlow = xlow
         self.xup = xup
+        self._create_hist([(nbin, xlow, xup)])
 
     def reinitial_hist_with_fill_array(self, fill_array):
         """Reset histogram with new bin range with given fill array."""
-        xlow = math.floor(min(fill_array))
-        xup = math.ceil(max(fill_array))
-        self._hist = ROOT.TH1D(self.name, self.title, self.nbin, xlow, xup)
+        array_min, array_max = plot_utils.get_array_range(
+            plot_utils.as_arrays([fill_array])[0]
+        )
+        if array_min > array_max:
+            # no finite entries
+            array_min, array_max = 0.0, 1.0
+        xlow = math.floor(array_min)
+        xup = math.ceil(array_max)
+        if xup <= xlow:
+            xup = xlow + 1
+        self._create_hist([(self.nbin, xlow, xup)])
 
 
 class TH1FTool(TH1Tool):
     """ROOT TH1F class wrapper for easy handling."""
 
+    _root_type = "TH1F"
+    _array_dtype = np.float32
+
     def __init__(
         self,
         name: str,
@@ -571,6 +1204,7 @@ class TH1FTool(TH1Tool):
         create_new_canvas: bool = False,
         canvas: Union[ROOT.TCanvas, None] = None,
         canvas_id: int = 1,
+        backend: str = "root",
     ) -> None:
         """Inits TH1FTool"""
         super().__init__(
@@ -580,17 +1214,26 @@ class TH1FTool(TH1Tool):
             create_new_canvas=create_new_canvas,
             canvas=canvas,
             canvas_id=canvas_id,
+            backend=backend,
         )
-        self._hist = ROOT.TH1F(name, title, nbin, xlow, xup)
         self.nbin = nbin
         self.xlow = xlow
         self.xup = xup
+        self._create_hist([(nbin, xlow, xup)])
 
     def reinitial_hist_with_fill_array(self, fill_array):
         """Reset histogram with new bin range with given fill array."""
-        xlow = math.floor(min(fill_array))
-        xup = math.ceil(max(fill_array))
-        self._hist = ROOT.TH1F(self.name, self.title, self.nbin, xlow, xup)
+        array_min, array_max = plot_utils.get_array_range(
+            plot_utils.as_arrays([fill_array])[0]
+        )
+        if array_min > array_max:
+            # no finite entries
+            array_min, array_max = 0.0, 1.0
+        xlow = math.floor(array_min)
+        xup = math.ceil(array_max)
+        if xup <= xlow:
+            xup = xlow + 1
+        self._create_hist([(self.nbin, xlow, xup)])
 
 
 class TH2Tool(TH1Tool):
@@ -609,6 +1252,7 @@ class TH2Tool(TH1Tool):
         create_new_canvas: bool = False,
         canvas: Union[ROOT.TCanvas, None] = None,
         canvas_id: int = 1,
+        backend: str = "root",
     ) -> None:
         """Inits TH1DTool"""
         super().__init__(
@@ -618,11 +1262,39 @@ class TH2Tool(TH1Tool):
             create_new_canvas=create_new_canvas,
             canvas=canvas,
             canvas_id=canvas_id,
+            backend=backend,
         )
 
-    def fill_hist(self, fill_array_x, fill_array_y, weight_array=None):
-        """Fills the histogram with 2D array."""
-        if len(fill_array_x) != len(fill_array_y):
+    @profiling.profiled("fill")
+    def fill_hist(
+        self,
+        fill_array_x,
+        fill_array_y,
+        weight_array=None,
+        chunk_size: int = FILL_CHUNK_SIZE,
+        max_memory: Union[int, None] = None,
+        progress: Union[Callable[[int, Union[int, None]], None], None] = None,
+        workers: Union[int, None] = 1,
+    ) -> None:
+        """Fills the histogram with 2D array.
+
+        Note:
+            If x/y arrays have different length, the short length is used.
+        Buffer-protocol inputs are truncated in one slicing step and handed to
+        ROOT through FillN in contiguous blocks of chunk_size entries.
+            .npy paths, chunk iterators, max_memory, progress and workers are
+        handled as in TH1Tool.fill_hist.
+            Array-backed histograms are filled with numpy in the same blocks.
+
+        """
+        arrays = [fill_array_x, fill_array_y]
+        if weight_array is not None:
+            arrays.append(weight_array)
+        arrays, chunked = plot_utils.open_fill_inputs(arrays)
+        fill_array_x, fill_array_y = arrays[:2]
+        if chunked:
+            array_len = None
+        elif len(fill_array_x) != len(fill_array_y):
             warnings.warn(
                 "Different length of fill array x/y, using the short length. x length = {}, y length = {}".format(
                     len(fill_array_x), len(fill_array_y)
@@ -631,18 +1303,46 @@ class TH2Tool(TH1Tool):
             array_len = min(len(fill_array_x), len(fill_array_y))
         else:
             array_len = len(fill_array_x)
+        self.detach()
+        self._update_version()
+        if self._fill_blocks(
+            arrays, chunked, 2, chunk_size, max_memory, progress, workers
+        ):
+            return
         if weight_array is None:
             for index in range(array_len):
                 self._hist.Fill(fill_array_x[index], fill_array_y[index])
         else:
+            weight_array = arrays[2]
             for index in range(array_len):
                 self._hist.Fill(
                     fill_array_x[index], fill_array_y[index], weight_array[index]
                 )
 
+    def fill_hist_auto_range(
+        self,
+        fill_chunks: Iterable,
+        weight_chunks: Union[Iterable, None] = None,
+        buffer_size: int = 100000,
+        chunk_size: int = FILL_CHUNK_SIZE,
+    ) -> None:
+        """Not supported for 2D histograms, see TH1Tool.fill_hist_auto_range.
+
+        Raises:
+            ValueError: always, the automatic range is only chosen for 1D.
+
+        """
+        raise ValueError(
+            "fill_hist_auto_range is only supported for 1D histograms, "
+            "use fill_hist with a fixed binning for {}.".format(self.name)
+        )
+
 
 class TH2FTool(TH2Tool):
-    """ROOT TH1F class wrapper for easy handling."""
+    """ROOT TH2F class wrapper for easy handling."""
+
+    _root_type = "TH2F"
+    _array_dtype = np.float32
 
     def __init__(
         self,
@@ -658,6 +1358,7 @@ class TH2FTool(TH2Tool):
         create_new_canvas: bool = False,
         canvas: Union[ROOT.TCanvas, None] = None,
         canvas_id: int = 1,
+        backend: str = "root",
     ) -> None:
         """Inits TH1FTool"""
         super().__init__(
@@ -667,18 +1368,30 @@ class TH2FTool(TH2Tool):
             create_new_canvas=create_new_canvas,
             canvas=canvas,
             canvas_id=canvas_id,
+            backend=backend,
         )
-        self._hist = ROOT.TH2F(name, title, nbinx, xlow, xup, nbiny, ylow, yup)
         self.nbinx = nbinx
         self.xlow = xlow
         self.xup = xup
         self.nbiny = nbiny
         self.ylow = ylow
         self.yup = yup
+        self._create_hist([(nbinx, xlow, xup), (nbiny, ylow, yup)])
+
+
+class THStackTool(render_cache.RenderMixin):
+    """ROOT THStack class wrapper for easy handing
+
+    Note:
+        The summed histogram and total weight of the members are kept as
+    running totals. They are updated with one bin-array operation when members
+    are added, removed or rescaled with add_hist/remove_hist/scale_hist, so
+    get_added_hist and get_total_weights don't loop over members. Call
+    recompute_totals after modifying members in other ways.
 
+    """
 
-class THStackTool(object):
-    """ROOT THStack class wrapper for easy handing"""
+    _default_save_dir = "hist_stacks"
 
     def __init__(
         self,
@@ -687,22 +1400,64 @@ class THStackTool(object):
         hist_list: List["TH1Tool"],
         create_new_canvas: bool = False,
         canvas: Union[ROOT.TCanvas, None] = None,
+        copy_hists: bool = True,
     ) -> None:
-        """Inits THStackTool."""
+        """Inits THStackTool.
+
+        Note:
+            If copy_hists is False, copy-on-write views of the input histograms
+        are stacked instead of deep copies, see TH1Tool.get_view(). Building
+        the ROOT stack clones every member, so views only save copies for
+        stacks that are not drawn (totals, rebinning, caching...).
+            Without canvas, a canvas is taken from the canvas pool when first
+        drawn, unless create_new_canvas is True.
+
+        """
         super().__init__()
         self.name = name
         self.title = title
         self._hist_list = []
         for hist in hist_list:
-            self._hist_list.append(copy.deepcopy(hist))
+            if copy_hists:
+                self._hist_list.append(copy.deepcopy(hist))
+            else:
+                self._hist_list.append(hist.get_view())
         self.create_new_canvas = create_new_canvas
         self._canvas = canvas
-        if create_new_canvas or (canvas is None):
+        if create_new_canvas:
             self.create_canvas()
-        self._hist_stack = ROOT.THStack(name, title)
-        for hist in self._hist_list:
-            self._hist_stack.Add(hist.get_hist())
+        # the ROOT stack is built when first needed, see get_hstack()
+        self._hist_stack = None
+        self._hist_band = None
+        self._stack_modified = True
+        self._total = None
+        self._total_shared = False
+        self._total_weights = 0
+        self.recompute_totals()
+
+    def add_hist(self, hist: "TH1Tool", copy_hist: bool = True) -> None:
+        """Adds a histogram on top of the stack.
+
+        Note:
+            If copy_hist is False, a copy-on-write view of hist is stacked, see
+        TH1Tool.get_view().
+
+        """
+        if copy_hist:
+            hist = copy.deepcopy(hist)
+        else:
+            hist = hist.get_view()
+        self._hist_list.append(hist)
+        self._stack_modified = True
+        hist_array_added = hist.get_hist_array()
+        if self._total is None:
+            self._total = hist_array_added.copy()
+        else:
+            self._detach_total()
+            self._total.add(hist_array_added)
+        self._total_weights += hist_array_added.get_sum_of_weights()
 
+    @profiling.profiled("build_legend")
     def build_legend(
         self, x1: float = 0.8, y1: float = 0.75, x2: float = 0.9, y2: float = 0.9
     ) -> None:
@@ -717,11 +1472,10 @@ class THStackTool(object):
         self._canvas.Update()
 
     def create_canvas(self) -> None:
-        """Creats new canvas for drawing."""
-        self._canvas = ROOT.TCanvas(
-            self.name + "_stack", self.title + "_stack", 800, 600
-        )
+        """Gets a cleared canvas for drawing from the canvas pool."""
+        self._canvas = canvas_pool.get_canvas_pool().acquire(self.title + "_stack")
 
+    @profiling.profiled("draw")
     def draw(self, draw_cfg="", log_scale=False):
         """Makes the plot.
 
@@ -729,18 +1483,45 @@ class THStackTool(object):
             draw_options: Options applied when calling draw function in ROOT.
 
         """
+        if self._canvas is None:
+            self.create_canvas()
         self._canvas.cd()
         if log_scale:
             self._canvas.SetLogy(2)
-        self._hist_stack.Draw(draw_cfg)
+        self.get_hstack().Draw(draw_cfg)
+        if self._hist_band is not None:
+            self._hist_band.apply_config()
+            self._hist_band.get_hist().Draw("e2 same")
         self._canvas.Update()
 
-    def get_added_hist(self) -> ROOT.TH1:
-        """Combines hists in self._hist_list together."""
-        merged_hist_root = plot_utils.merge_hists(self._hist_list)
-        merged_hist = TH1Tool("merged_hist", "merged_hist")
-        merged_hist._hist = merged_hist_root
-        return merged_hist
+    def get_added_hist(self) -> "TH1Tool":
+        """Returns the running sum of hists in self._hist_list.
+
+        Note:
+            The returned array-backed TH1Tool is a copy-on-write view of the
+        running sum: no bins are copied unless it or the stack is modified
+        afterwards.
+
+        """
+        if self._total is None:
+            raise ValueError("Empty hist stack.")
+        merged_hist = TH1Tool("merged_hist", "merged_hist", backend="numpy")
+        merged_hist.set_hist_array(self._total)
+        self._total_shared = True
+        return merged_hist.get_view()
+
+    @staticmethod
+    def get_band_config() -> Cfg_Dict:
+        """Returns default config of the uncertainty band drawn over the stack."""
+        return {
+            "hist": {
+                "SetStats": 0,
+                "SetFillColor": ROOT.kBlack,
+                "SetFillStyle": 3354,
+                "SetLineWidth": 0,
+                "SetMarkerSize": 0,
+            }
+        }
 
     def get_canvas(self) -> ROOT.TCanvas:
         """Returns the ROOT canvas in use."""
@@ -751,35 +1532,133 @@ class THStackTool(object):
         return self._hist_list
 
     def get_hstack(self) -> ROOT.THStack:
-        """Returns ROOT hist stack object."""
+        """Returns ROOT hist stack object.
+
+        Note:
+            Members which are copy-on-write views are detached first, so the
+        stack never holds the ROOT histograms of their sources.
+
+        """
+        if self._stack_modified:
+            # members were added, removed or replaced, restack them in order
+            self._hist_stack = ROOT.THStack(self.name, self.title)
+            for hist in self._hist_list:
+                hist.detach()
+                self._hist_stack.Add(hist.get_hist())
+            self._stack_modified = False
         return self._hist_stack
 
     def get_total_weights(self) -> float:
         """Returns sum of SumOfWeights of all histograms in self._hist_list"""
-        total_weights = 0
+        return self._total_weights
+
+    def recompute_totals(self) -> None:
+        """Recomputes running sum and total weight from all members."""
+        self._total_weights = 0
         for hist in self._hist_list:
-            total_weights += hist.get_hist().GetSumOfWeights()
-        return total_weights
+            self._total_weights += hist.get_hist_array().get_sum_of_weights()
+        if self._hist_list:
+            self._total = merge_engine.merge_hists(self._hist_list, workers=1)
+        else:
+            self._total = None
+        self._total_shared = False
+
+    def rebin(self, new_edges: np.ndarray, axis_id: int = 0) -> None:
+        """Rebins all members onto new bin edges, see TH1Tool.rebin.
+
+        Note:
+            Running totals are recomputed and the uncertainty band, which can't
+        be rebinned, is removed.
+
+        """
+        _rebin_hists(self._hist_list, new_edges, axis_id)
+        self._hist_band = None
+        self._stack_modified = True
+        self.recompute_totals()
+
+    def release_canvas(self) -> None:
+        """Gives the canvas back to the canvas pool if it comes from there."""
+        if canvas_pool.get_canvas_pool().release(self._canvas):
+            self._canvas = None
+
+    def remove_hist(self, hist: Union[int, "TH1Tool"]) -> "TH1Tool":
+        """Removes a member (given by index or object) and returns it."""
+        hist_id = self._get_hist_id(hist)
+        hist = self._hist_list.pop(hist_id)
+        self._stack_modified = True
+        if not self._hist_list:
+            self._total = None
+            self._total_shared = False
+            self._total_weights = 0
+            return hist
+        hist_array_removed = hist.get_hist_array()
+        self._detach_total()
+        self._total.subtract(hist_array_removed)
+        self._total_weights -= hist_array_removed.get_sum_of_weights()
+        return hist
 
     def save(
         self,
         save_dir: Union[str, None] = None,
         save_file_name: str = None,
         save_format: str = "png",
+        release_canvas: bool = False,
     ) -> None:
-        """Saves plots to specified path."""
-        if save_dir is None:
-            save_dir = os.getcwd() + "/hist_stacks"
-        else:
-            if not os.path.isabs(save_dir):
-                save_dir = "./" + save_dir
-        if save_file_name is None:
-            save_file_name = self.name
+        """Saves plots to specified path.
+
+        Note:
+            If release_canvas is True, a canvas from the canvas pool is given
+        back to the pool after saving, draw again before using the plot again.
+
+        """
+        save_path = self.get_save_path(save_dir, save_file_name, save_format)
+        save_dir = os.path.dirname(save_path)
         if not os.path.exists(save_dir):
             print("save_dir:", save_dir)
             os.makedirs(save_dir)
-        save_path = save_dir + "/" + save_file_name + "." + save_format
         self._canvas.SaveAs(save_path)
+        if release_canvas:
+            self.release_canvas()
+
+    def scale_hist(self, hist: Union[int, "TH1Tool"], factor: float) -> None:
+        """Scales a member (given by index or object) by factor."""
+        hist = self._hist_list[self._get_hist_id(hist)]
+        hist_array_old = hist.get_hist_array()
+        self._detach_total()
+        self._total.subtract(hist_array_old)
+        self._total_weights -= hist_array_old.get_sum_of_weights()
+        hist.scale(factor)
+        # scaling a view clones its histogram, which must be restacked
+        self._stack_modified = True
+        hist_array_new = hist.get_hist_array()
+        self._total.add(hist_array_new)
+        self._total_weights += hist_array_new.get_sum_of_weights()
+
+    def set_band(
+        self,
+        band: Union[variations.VariationBundle, hist_array.HistArray, None],
+        method: str = "quadrature",
+        include_stat: bool = True,
+        config: Union[Cfg_Dict, None] = None,
+    ) -> None:
+        """Sets uncertainty band drawn over the stack, None to remove it.
+
+        Note:
+            band is a variations.VariationBundle of the stack total (see
+        VariationBundle.add to combine the bundles of the members) or a
+        hist_array.HistArray band as returned by VariationBundle.get_band.
+        config defaults to get_band_config().
+
+        """
+        if band is None:
+            self._hist_band = None
+            return
+        self._hist_band = _get_band_tool(
+            band, self.name + "_band", self.title, False, method, include_stat
+        )
+        if config is None:
+            config = self.get_band_config()
+        self._hist_band.set_config(config)
 
     def set_canvas(self, canvas: ROOT.TCanvas) -> None:
         """Sets canvas from external."""
@@ -787,3 +1666,55 @@ class THStackTool(object):
 
     def set_palette(self, palette: str) -> None:
         ROOT.gStyle.SetPalette(getattr(ROOT, palette))
+
+    def _detach_total(self) -> None:
+        """Copies the running sum before updating it if it was handed out."""
+        if self._total_shared:
+            self._total = self._total.copy()
+            self._total_shared = False
+
+    def _get_hist_id(self, hist: Union[int, "TH1Tool"]) -> int:
+        """Returns index of a member given by index or object."""
+        if isinstance(hist, int):
+            return hist
+        for hist_id, member in enumerate(self._hist_list):
+            if member is hist:
+                return hist_id
+        raise ValueError("Histogram is not in the stack.")
+
+    def _get_render_hists(self) -> List["TH1Tool"]:
+        """Returns histograms fingerprinted by render(), band included."""
+        if self._hist_band is None:
+            return self._hist_list
+        return self._hist_list + [self._hist_band]
+
+
+def _get_band_tool(
+    band: Union[variations.VariationBundle, hist_array.HistArray],
+    name: str,
+    title: str,
+    relative: bool,
+    method: str,
+    include_stat: bool,
+) -> "TH1Tool":
+    """Returns array-backed TH1Tool of an uncertainty band."""
+    if isinstance(band, variations.VariationBundle):
+        if relative:
+            band = band.get_relative_band(method, include_stat)
+        else:
+            band = band.get_band(method, include_stat)
+    hist_band = TH1Tool(name, title, backend="numpy")
+    hist_band.set_hist_array(band)
+    return hist_band
+
+
+def _rebin_hists(
+    hist_list: List["TH1Tool"], new_edges: np.ndarray, axis_id: int
+) -> None:
+    """Rebins histograms in place with one hist_array.rebin_many call."""
+    rebinned = hist_array.rebin_many(
+        [hist.get_hist_array() for hist in hist_list], new_edges, axis_id
+    )
+    for hist, array in zip(hist_list, rebinned):
+        hist.set_hist_array(array)
+        hist._update_binning_attributes(axis_id)
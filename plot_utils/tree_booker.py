@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from typing import List, Union
+
+import numpy as np
+
+from HEPTools.plot_utils import hist_array, profiling
+from HEPTools.plot_utils.lazy_root import ROOT
+
+# prefix of the columns defined for expressions which are not tree branches
+DEFINED_COLUMN_PREFIX = "hep_tools_column_"
+
+
+class TreeBooker(object):
+    """Books many histograms on one tree and fills them in one event loop.
+
+    A class to declare TH1Tool objects (with x/y expressions, weight and
+    selection) against a TTree or a chain of files. They are booked lazily on
+    a ROOT RDataFrame and filled together in a single multithreaded event
+    loop by run(), so the tree is read only once for all histograms.
+
+    Example:
+        booker = TreeBooker("CollectionTree", file_paths)
+        hist = booker.book(
+            TH1DTool("pt", "pt", 50, 0, 500, config=config),
+            "jet_pt / 1000",
+            weight="weight",
+            selection="n_jets >= 2",
+        )
+        booker.run()
+        hist.draw()
+
+    Note:
+        Expressions and selections are ROOT C++ expressions (or branch
+    names). Identical expressions and selections are defined only once and
+    shared by all histograms using them.
+        With multithreading, per-thread partial histograms are merged in an
+    unspecified order, so bin contents may differ by rounding between runs.
+
+    """
+
+    def __init__(
+        self,
+        tree_name: str,
+        file_paths: Union[str, List[str]],
+        num_threads: int = 0,
+    ) -> None:
+        """Inits TreeBooker with tree name and input files.
+
+        Note:
+            num_threads is passed to ROOT.EnableImplicitMT (0 means all
+        cores), 1 runs the event loop in the current thread. Implicit
+        multithreading is enabled for the whole process and must be enabled
+        before the first RDataFrame is created.
+
+        """
+        if isinstance(file_paths, str):
+            file_paths = [file_paths]
+        self.tree_name = tree_name
+        self.file_paths = list(file_paths)
+        if num_threads != 1 and not ROOT.IsImplicitMTEnabled():
+            ROOT.EnableImplicitMT(num_threads)
+        self._bookings = []
+
+    def book(
+        self,
+        hist: "TH1Tool",
+        x_expr: str,
+        y_expr: Union[str, None] = None,
+        weight: Union[str, None] = None,
+        selection: Union[str, None] = None,
+    ) -> "TH1Tool":
+        """Declares a histogram to be filled by the next run() and returns it.
+
+        Note:
+            hist gives name, binning and config, y_expr is needed for 2D
+        histograms. Its contents are replaced when run() is called.
+
+        """
+        num_axes = 1 if y_expr is None else 2
+        if hist.get_hist_array().ndim != num_axes:
+            raise ValueError(
+                "Expect {} expressions for {}.".format(
+                    hist.get_hist_array().ndim, hist.name
+                )
+            )
+        self._bookings.append((hist, x_expr, y_expr, weight, selection))
+        return hist
+
+    def get_num_booked(self) -> int:
+        """Returns number of histograms waiting for run()."""
+        return len(self._bookings)
+
+    @profiling.profiled("tree_loop")
+    def run(self) -> List["TH1Tool"]:
+        """Runs one event loop filling all booked histograms.
+
+        Note:
+            Returns the booked histograms in booking order, which become
+        array-backed (their ROOT histograms are created again when drawn).
+        The booking list is cleared, so new bookings need another run().
+
+        """
+        bookings = self._bookings
+        self._bookings = []
+        if not bookings:
+            return []
+        data_frame = ROOT.RDataFrame(
+            self.tree_name, ROOT.std.vector["string"](self.file_paths)
+        )
+        branch_names = set(str(column) for column in data_frame.GetColumnNames())
+        # define all expressions first, so every filter node sees them
+        columns = {}
+        for _, *expressions, _ in bookings:
+            for expression in expressions:
+                if expression is None or expression in columns:
+                    continue
+                if expression in branch_names:
+                    columns[expression] = expression
+                    continue
+                column = DEFINED_COLUMN_PREFIX + str(len(columns))
+                data_frame = data_frame.Define(column, expression)
+                columns[expression] = column
+        filter_nodes = {None: data_frame}
+        results = []
+        for hist, x_expr, y_expr, weight, selection in bookings:
+            node = filter_nodes.get(selection)
+            if node is None:
+                node = filter_nodes[selection] = data_frame.Filter(selection)
+            model_args = [hist.name, hist.title]
+            booked_array = hist.get_hist_array()
+            for axis_edges, is_uniform in zip(booked_array.edges, booked_array.uniform):
+                if is_uniform:
+                    model_args += [len(axis_edges) - 1, axis_edges[0], axis_edges[-1]]
+                else:
+                    model_args += [
+                        len(axis_edges) - 1,
+                        np.ascontiguousarray(axis_edges),
+                    ]
+            hist_columns = [columns[x_expr]]
+            if y_expr is None:
+                book_hist = node.Histo1D
+                model = ROOT.RDF.TH1DModel(*model_args)
+            else:
+                book_hist = node.Histo2D
+                model = ROOT.RDF.TH2DModel(*model_args)
+                hist_columns.append(columns[y_expr])
+            if weight is not None:
+                hist_columns.append(columns[weight])
+            results.append(book_hist(model, *hist_columns))
+        # the first access triggers the event loop for all booked results
+        for (hist, *_), result in zip(bookings, results):
+            result_array = hist_array.HistArray.from_root(
+                result.GetValue(), copy_arrays=True
+            )
+            dtype = hist.get_hist_array().sumw.dtype
+            result_array.sumw = result_array.sumw.astype(dtype, copy=False)
+            hist.set_hist_array(result_array)
+        return [hist for hist, *_ in bookings]
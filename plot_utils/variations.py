@@ -0,0 +1,299 @@
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from HEPTools.plot_utils import hist_array
+
+BAND_METHODS = ["envelope", "quadrature"]
+
+
+class VariationBundle(object):
+    """Nominal histogram bundled with its systematic variations.
+
+    A class to hold the up/down variations of one observable as two
+    (number of systematics, number of bins) arrays next to the nominal
+    hist_array.HistArray, so that envelopes, quadrature sums, covariances and
+    uncertainty bands are computed in vectorized passes over all systematics
+    instead of loops over histograms.
+
+    Note:
+        Rows of up/down follow the order of names, columns follow the
+    flattened bin layout of the nominal (ROOT global bin numbering, including
+    under/overflow bins). Only contents of the variations are kept, errors are
+    those of the nominal.
+        One-sided systematics (no down variation) have their down row equal
+    to the nominal contents.
+
+    """
+
+    def __init__(
+        self,
+        nominal: hist_array.HistArray,
+        names: List[str],
+        up: np.ndarray,
+        down: Union[np.ndarray, None] = None,
+    ) -> None:
+        """Inits VariationBundle with nominal and (systematics, bins) arrays.
+
+        Note:
+            nominal and the arrays are used without copy. If down is None, all
+        systematics are one-sided.
+
+        """
+        if len(set(names)) != len(names):
+            raise ValueError("Duplicated systematic names.")
+        self.nominal = nominal
+        self.names = list(names)
+        num_cells = nominal.sumw.size
+        self.up = np.asarray(up, dtype=np.float64).reshape(len(self.names), num_cells)
+        if down is None:
+            self.down = np.repeat(self._get_nominal_row(), len(self.names), axis=0)
+            self.one_sided = np.ones(len(self.names), dtype=bool)
+        else:
+            self.down = np.asarray(down, dtype=np.float64).reshape(self.up.shape)
+            self.one_sided = np.zeros(len(self.names), dtype=bool)
+
+    @classmethod
+    def from_hist_arrays(
+        cls,
+        nominal: hist_array.HistArray,
+        variations: Dict[
+            str, Tuple[hist_array.HistArray, Union[hist_array.HistArray, None]]
+        ],
+    ) -> "VariationBundle":
+        """Creates VariationBundle from {name: (up, down)} of HistArray.
+
+        Note:
+            down can be None for one-sided systematics. Bin arrays are copied
+        into the bundle, nominal included.
+
+        """
+        names = list(variations)
+        up_rows = []
+        down_rows = []
+        one_sided = []
+        nominal_row = nominal.sumw.reshape(-1)
+        for name in names:
+            up_array, down_array = variations[name]
+            for array in (up_array, down_array):
+                if array is not None and not nominal.is_compatible(array):
+                    raise ValueError(
+                        "Variation {} has different binning than nominal.".format(name)
+                    )
+            up_rows.append(up_array.sumw.reshape(-1))
+            if down_array is None:
+                down_rows.append(nominal_row)
+                one_sided.append(True)
+            else:
+                down_rows.append(down_array.sumw.reshape(-1))
+                one_sided.append(False)
+        num_cells = nominal.sumw.size
+        if names:
+            up = np.stack(up_rows).astype(np.float64, copy=False)
+            down = np.stack(down_rows).astype(np.float64, copy=False)
+        else:
+            up = np.zeros((0, num_cells))
+            down = np.zeros((0, num_cells))
+        bundle = cls(nominal.copy(), names, up, down)
+        bundle.one_sided[...] = one_sided
+        return bundle
+
+    @property
+    def num_variations(self) -> int:
+        """Returns number of systematics."""
+        return len(self.names)
+
+    def add(self, other: "VariationBundle") -> None:
+        """Adds other bundle (e.g. another sample) to this one.
+
+        Note:
+            Systematics with the same name are treated as fully correlated and
+        summed row by row. Systematics missing in one of the bundles take its
+        nominal contents. A systematic stays one-sided only if it is one-sided
+        (or missing) in both bundles.
+
+        """
+        if not self.nominal.is_compatible(other.nominal):
+            raise ValueError("Can't add bundles with different binning.")
+        new_names = [name for name in other.names if name not in self.names]
+        if new_names:
+            nominal_rows = np.repeat(self._get_nominal_row(), len(new_names), axis=0)
+            self.names += new_names
+            self.up = np.concatenate([self.up, nominal_rows])
+            self.down = np.concatenate([self.down, nominal_rows])
+            self.one_sided = np.concatenate(
+                [self.one_sided, np.ones(len(new_names), dtype=bool)]
+            )
+        other_nominal_row = other._get_nominal_row()
+        row_ids = [self.names.index(name) for name in other.names]
+        self.up += other_nominal_row
+        self.down += other_nominal_row
+        self.up[row_ids] += other.up - other_nominal_row
+        self.down[row_ids] += other.down - other_nominal_row
+        self.one_sided[row_ids] &= other.one_sided
+        self.nominal.add(other.nominal)
+
+    def get_band(
+        self, method: str = "quadrature", include_stat: bool = True
+    ) -> hist_array.HistArray:
+        """Returns uncertainty band around the nominal as HistArray.
+
+        Note:
+            The band is drawable with ROOT option "e2": bin contents are the
+        band centers and errors are the half widths, so an asymmetric band
+        [nominal - err_down, nominal + err_up] is represented exactly.
+
+        """
+        err_down, err_up = self.get_errors(method, include_stat)
+        nominal_row = self._get_nominal_row()[0]
+        sumw = nominal_row + 0.5 * (err_up - err_down)
+        half_width = 0.5 * (err_up + err_down)
+        band = hist_array._new_like(
+            self.nominal,
+            sumw.reshape(self.nominal.sumw.shape),
+            (half_width * half_width).reshape(self.nominal.sumw.shape),
+        )
+        band.entries = self.nominal.entries
+        band.reset_stats()
+        return band
+
+    def get_covariance(self, include_stat: bool = False) -> np.ndarray:
+        """Returns (bins, bins) covariance matrix of in-range bins.
+
+        Note:
+            Systematics are symmetrized (see get_symmetric_shifts) and treated
+        as fully correlated across bins and uncorrelated with each other. For
+        2D histograms bins are flattened as in ROOT global bin numbering.
+
+        """
+        shifts = self._get_inner_rows(self.get_symmetric_shifts())
+        covariance = shifts.T @ shifts
+        if include_stat:
+            stat_variance = self.nominal.get_inner(self.nominal.sumw2).reshape(-1)
+            covariance[np.diag_indices_from(covariance)] += stat_variance
+        return covariance
+
+    def get_envelope(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (err_down, err_up) from the largest shifts in each bin."""
+        up_shifts, down_shifts = self.get_shifts()
+        if not self.num_variations:
+            zeros = np.zeros(self.nominal.sumw.size)
+            return zeros, zeros.copy()
+        err_up = np.maximum(up_shifts.max(axis=0), down_shifts.max(axis=0))
+        err_down = -np.minimum(up_shifts.min(axis=0), down_shifts.min(axis=0))
+        return np.maximum(err_down, 0.0), np.maximum(err_up, 0.0)
+
+    def get_errors(
+        self, method: str = "quadrature", include_stat: bool = True
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (err_down, err_up) of each bin.
+
+        Args:
+
+            method: "quadrature" (see get_quadrature_sum) or "envelope".
+            include_stat: Adds the nominal statistical errors in quadrature.
+
+        """
+        if method not in BAND_METHODS:
+            raise ValueError("Unsupported band method: {}".format(method))
+        if method == "quadrature":
+            err_down, err_up = self.get_quadrature_sum()
+        else:
+            err_down, err_up = self.get_envelope()
+        if include_stat:
+            stat_variance = self.nominal.sumw2.reshape(-1)
+            err_down = np.sqrt(err_down * err_down + stat_variance)
+            err_up = np.sqrt(err_up * err_up + stat_variance)
+        return err_down, err_up
+
+    def get_quadrature_sum(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (err_down, err_up) summing shifts of systematics in quadrature.
+
+        Note:
+            For each systematic, the larger upward shift of its up/down
+        variations counts in err_up and the larger downward shift in err_down.
+
+        """
+        up_shifts, down_shifts = self.get_shifts()
+        upward = np.maximum(np.maximum(up_shifts, down_shifts), 0.0)
+        downward = np.maximum(np.maximum(-up_shifts, -down_shifts), 0.0)
+        err_up = np.sqrt(np.einsum("ij,ij->j", upward, upward))
+        err_down = np.sqrt(np.einsum("ij,ij->j", downward, downward))
+        return err_down, err_up
+
+    def get_relative_band(
+        self, method: str = "quadrature", include_stat: bool = True
+    ) -> hist_array.HistArray:
+        """Returns band divided by the nominal, for ratio pads.
+
+        Note:
+            Empty nominal bins get content and error 0, as in
+        HistArray.get_relative_error_band.
+
+        """
+        band = self.get_band(method, include_stat)
+        nominal_sumw = self.nominal.sumw.astype(np.float64)
+        nonzero = nominal_sumw != 0
+        safe_nominal = np.where(nonzero, nominal_sumw, 1.0)
+        band.sumw[...] = np.where(nonzero, band.sumw / safe_nominal, 0.0)
+        band.sumw2[...] = np.where(
+            nonzero, band.sumw2 / (safe_nominal * safe_nominal), 0.0
+        )
+        band.reset_stats()
+        return band
+
+    def get_shifts(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (up - nominal, down - nominal) as (systematics, bins) arrays."""
+        nominal_row = self._get_nominal_row()
+        return self.up - nominal_row, self.down - nominal_row
+
+    def get_symmetric_shifts(self) -> np.ndarray:
+        """Returns one signed shift per systematic and bin.
+
+        Note:
+            Two-sided systematics use (up - down) / 2, one-sided ones up -
+        nominal.
+
+        """
+        up_shifts, down_shifts = self.get_shifts()
+        return np.where(
+            self.one_sided[:, np.newaxis], up_shifts, 0.5 * (up_shifts - down_shifts)
+        )
+
+    def get_variation(
+        self, name: str
+    ) -> Tuple[hist_array.HistArray, Union[hist_array.HistArray, None]]:
+        """Returns (up, down) HistArray of a systematic, down is None if one-sided."""
+        row_id = self.names.index(name)
+        shape = self.nominal.sumw.shape
+        variations = []
+        for rows in (self.up, self.down):
+            array = hist_array._new_like(
+                self.nominal,
+                rows[row_id].reshape(shape).astype(self.nominal.sumw.dtype),
+                self.nominal.sumw2.copy(),
+            )
+            array.entries = self.nominal.entries
+            array.reset_stats()
+            variations.append(array)
+        if self.one_sided[row_id]:
+            variations[1] = None
+        return variations[0], variations[1]
+
+    def scale(self, factor: float) -> None:
+        """Scales nominal and all variations by factor."""
+        self.nominal.scale(factor)
+        self.up *= factor
+        self.down *= factor
+
+    def _get_inner_rows(self, rows: np.ndarray) -> np.ndarray:
+        """Returns (rows, in-range bins) view of (rows, bins) array."""
+        shape = (len(rows),) + self.nominal.sumw.shape
+        inner = rows.reshape(shape)[
+            (slice(None),) + (slice(1, -1),) * self.nominal.ndim
+        ]
+        return inner.reshape(len(rows), -1)
+
+    def _get_nominal_row(self) -> np.ndarray:
+        """Returns nominal contents as (1, bins) float64 array."""
+        return self.nominal.sumw.reshape(1, -1).astype(np.float64)
@@ -0,0 +1,33 @@
+import numpy as np
+
+from HEPTools.plot_utils import hist_array, plot_utils, th1_tools
+
+
+def test_array_range_ignores_non_finite():
+    array = np.array([np.nan, -np.inf, 1.0, 3.0, np.inf])
+    assert plot_utils.get_array_range(array) == (1.0, 3.0)
+    assert plot_utils.get_array_range(np.array([np.inf])) == (np.inf, -np.inf)
+
+
+def test_extend_axis_sends_non_finite_entries_to_flow_bins():
+    array = hist_array.HistArray.from_uniform([(4, 0.0, 4.0)])
+    fill_array = np.array([1.0, 6.0, np.inf, -np.inf])
+    array.extend_axis(0, *plot_utils.get_array_range(fill_array))
+    array.extend_axis(0, -np.inf, np.inf)
+    array.fill(fill_array)
+    np.testing.assert_array_equal(array.edges[0], [0.0, 2.0, 4.0, 6.0, 8.0])
+    assert array.sumw[0] == 1
+    assert array.sumw[-1] == 1
+    assert array.get_inner().sum() == 2
+
+
+def test_fill_hist_auto_range_with_inf_terminates():
+    hist = th1_tools.TH1DTool("auto", "auto", 4, 0, 4, backend="numpy")
+    hist.fill_hist_auto_range(
+        [np.array([1.0, 2.0]), np.array([1.0, np.inf, -np.inf, 9.0])], buffer_size=2
+    )
+    array = hist.get_hist_array()
+    assert array.entries == 6
+    assert array.sumw[0] == 1
+    assert array.sumw[-1] == 1
+    assert array.edges[0][-1] > 9.0
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from HEPTools.plot_utils import hist_array, th1_tools
+
+NUM_ENTRIES = 5 * hist_array.FILL_UNIT_SIZE + 123
+
+
+@pytest.fixture(scope="module")
+def entries():
+    rng = np.random.default_rng(8)
+    return rng.normal(0.0, 3.0, NUM_ENTRIES), rng.random(NUM_ENTRIES)
+
+
+def fill(*fill_args, **fill_kwargs):
+    hist = th1_tools.TH1DTool("hist", "hist", 50, -5, 5, backend="numpy")
+    hist.fill_hist(*fill_args, **fill_kwargs)
+    return hist.get_hist_array()
+
+
+def iter_blocks(array, block_size):
+    for start in range(0, len(array), block_size):
+        yield array[start : start + block_size]
+
+
+def assert_same_arrays(array, expected):
+    np.testing.assert_array_equal(array.sumw, expected.sumw)
+    np.testing.assert_array_equal(array.sumw2, expected.sumw2)
+    np.testing.assert_array_equal(array.stats, expected.stats)
+    assert array.entries == expected.entries
+
+
+@pytest.mark.parametrize("max_memory", [1, 5000000])
+def test_bounded_memory_fill_is_identical(entries, max_memory):
+    x, weights = entries
+    assert_same_arrays(fill(x, weights, max_memory=max_memory), fill(x, weights))
+
+
+def test_generator_fill_is_identical(entries):
+    x, weights = entries
+    array = fill(iter_blocks(x, 77777), iter_blocks(weights, 77777), max_memory=3000000)
+    assert_same_arrays(array, fill(x, weights))
+
+
+def test_npy_fill_is_identical(entries, tmp_path):
+    x, weights = entries
+    np.save(tmp_path / "x.npy", x)
+    np.save(tmp_path / "weights.npy", weights)
+    array = fill(
+        np.load(tmp_path / "x.npy", mmap_mode="r"),
+        np.load(tmp_path / "weights.npy", mmap_mode="r"),
+        max_memory=2000000,
+    )
+    assert_same_arrays(array, fill(x, weights))
@@ -0,0 +1,50 @@
+import numpy as np
+
+from HEPTools.plot_utils import hist_array
+
+
+def test_fill_matches_np_histogram():
+    rng = np.random.default_rng(1)
+    x = rng.normal(0.0, 2.0, 10000)
+    weights = rng.random(10000)
+    array = hist_array.HistArray.from_uniform([(20, -4.0, 4.0)])
+    array.fill(x, weights=weights)
+    contents, edges = np.histogram(x, bins=20, range=(-4.0, 4.0), weights=weights)
+    variances, _ = np.histogram(x, bins=20, range=(-4.0, 4.0), weights=weights**2)
+    np.testing.assert_allclose(array.edges[0], edges)
+    np.testing.assert_allclose(array.get_inner(), contents)
+    np.testing.assert_allclose(array.get_inner(array.sumw2), variances)
+    np.testing.assert_allclose(array.sumw[0], weights[x < -4.0].sum())
+    np.testing.assert_allclose(array.sumw[-1], weights[x >= 4.0].sum())
+    assert array.entries == len(x)
+
+
+def test_fill_stats_follow_root_layout():
+    rng = np.random.default_rng(2)
+    x = rng.normal(0.0, 2.0, 1000)
+    weights = rng.random(1000)
+    array = hist_array.HistArray.from_uniform([(10, -3.0, 3.0)])
+    array.fill(x, weights=weights)
+    # [sumw, sumw2, sumwx, sumwx2] of in-range entries, as TH1::GetStats
+    in_range = (x >= -3.0) & (x < 3.0)
+    x, weights = x[in_range], weights[in_range]
+    expected = [
+        weights.sum(),
+        (weights**2).sum(),
+        (weights * x).sum(),
+        (weights * x * x).sum(),
+    ]
+    np.testing.assert_allclose(array.stats, expected)
+
+
+def test_fill_2d_matches_np_histogram2d():
+    rng = np.random.default_rng(3)
+    x = rng.random(5000) * 10
+    y = rng.random(5000) * 5
+    array = hist_array.HistArray.from_uniform([(10, 0.0, 10.0), (5, 0.0, 5.0)])
+    array.fill(x, y)
+    contents, _, _ = np.histogram2d(x, y, bins=[10, 5], range=[(0, 10), (0, 5)])
+    # sumw is indexed [y, x], as ROOT global bins
+    np.testing.assert_allclose(array.get_inner(), contents.T)
+    assert len(array.stats) == 7
+    np.testing.assert_allclose(array.stats[6], (x * y).sum())
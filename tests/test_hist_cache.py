@@ -0,0 +1,85 @@
+import sys
+
+import numpy as np
+import pytest
+
+from HEPTools.plot_utils import hist_cache, th1_tools
+
+
+def make_hists():
+    rng = np.random.default_rng(11)
+    hist_d = th1_tools.TH1DTool(
+        "hist_d", "D", 20, 0, 10, config={"x_axis": {"SetTitle": "x"}}, backend="numpy"
+    )
+    hist_d.fill_hist(rng.normal(5.0, 2.0, 1000), rng.random(1000))
+    hist_f = th1_tools.TH1FTool("hist_f", "F", 10, 0, 10, backend="numpy")
+    hist_f.fill_hist(rng.normal(5.0, 2.0, 1000))
+    hist_f.rebin([0.0, 2.0, 5.0, 10.0])
+    hist_2d = th1_tools.TH2FTool("hist_2d", "2D", 5, 0, 10, 4, 0, 8, backend="numpy")
+    hist_2d.fill_hist(rng.random(100) * 10, rng.random(100) * 8)
+    return [hist_d, hist_f, hist_2d]
+
+
+def assert_same_hist(hist, expected):
+    assert type(hist) is type(expected)
+    assert (hist.name, hist.title) == (expected.name, expected.title)
+    assert hist.get_config() == expected.get_config()
+    array = hist.get_hist_array()
+    expected_array = expected.get_hist_array()
+    for axis_edges, expected_edges in zip(array.edges, expected_array.edges):
+        np.testing.assert_array_equal(axis_edges, expected_edges)
+    assert array.sumw.dtype == expected_array.sumw.dtype
+    np.testing.assert_array_equal(array.sumw, expected_array.sumw)
+    np.testing.assert_array_equal(array.sumw2, expected_array.sumw2)
+    np.testing.assert_array_equal(array.stats, expected_array.stats)
+    assert array.entries == expected_array.entries
+
+
+def test_cache_round_trip(tmp_path):
+    hists = make_hists()
+    cache_path = str(tmp_path / "hists.cache")
+    hist_cache.save_cache(
+        cache_path,
+        {
+            "hist_d": hists[0],
+            "hist_f": hists[1],
+            "hist_2d": hists[2],
+            "stack": th1_tools.THStackTool("stack", "S", hists[:1], copy_hists=False),
+            "collection": th1_tools.HistCollection(
+                hists[:2], name="collection", title="C", copy_hists=False
+            ),
+        },
+    )
+    cache = hist_cache.load_cache(cache_path)
+    assert list(cache) == ["hist_d", "hist_f", "hist_2d", "stack", "collection"]
+    assert cache.get_kind("stack") == "stack"
+    for hist in hists:
+        assert_same_hist(cache[hist.name], hist)
+    assert (cache["hist_f"].nbin, cache["hist_f"].xup) == (3, 10.0)
+    assert (cache["hist_2d"].nbiny, cache["hist_2d"].yup) == (4, 8.0)
+    assert_same_hist(cache["stack"].get_hist_list()[0], hists[0])
+    for hist, expected in zip(cache["collection"].get_hist_list(), hists[:2]):
+        assert_same_hist(hist, expected)
+    # modifying a reloaded histogram doesn't change the file
+    cache["hist_d"].fill_hist(np.array([1.0]))
+    assert_same_hist(hist_cache.load_cache(cache_path)["hist_d"], hists[0])
+
+
+def test_reload_does_not_import_root(tmp_path):
+    if "ROOT" in sys.modules:
+        pytest.skip("ROOT is already imported")
+    cache_path = str(tmp_path / "hists.cache")
+    hists = make_hists()
+    hist_cache.save_cache(
+        cache_path, {"stack": th1_tools.THStackTool("stack", "S", hists[:1])}
+    )
+    cache = hist_cache.load_cache(cache_path)
+    assert len(cache["stack"].get_hist_list()) == 1
+    assert "ROOT" not in sys.modules
+
+
+def test_load_rejects_other_files(tmp_path):
+    bad_path = tmp_path / "bad"
+    bad_path.write_bytes(b"x" * 40)
+    with pytest.raises(ValueError):
+        hist_cache.load_cache(str(bad_path))
@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+
+# seconds, for importing th1_tools once numpy is loaded
+IMPORT_TIME_LIMIT = 0.1
+IMPORT_SCRIPT = """
+import sys
+import time
+
+import numpy
+
+start = time.perf_counter()
+import HEPTools.plot_utils.th1_tools
+
+print(time.perf_counter() - start)
+print("ROOT" in sys.modules)
+"""
+
+
+def test_th1_tools_import_is_fast_and_root_free():
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        env=env,
+        stdout=subprocess.PIPE,
+        check=True,
+        universal_newlines=True,
+    ).stdout.split()
+    import_time, root_loaded = float(output[0]), output[1] == "True"
+    assert not root_loaded
+    assert import_time < IMPORT_TIME_LIMIT
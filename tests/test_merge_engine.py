@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from HEPTools.plot_utils import merge_engine, th1_tools
+
+
+def make_hists(num_hists):
+    rng = np.random.default_rng(4)
+    hists = []
+    for hist_id in range(num_hists):
+        hist = th1_tools.TH1DTool(
+            "part_{}".format(hist_id), "part", 30, -3, 3, backend="numpy"
+        )
+        hist.fill_hist(rng.normal(0.0, 1.0, 1000), rng.random(1000) * 1e3)
+        hists.append(hist)
+    return hists
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_merge_matches_serial_add_in_input_order(workers):
+    hists = make_hists(10)
+    merged = merge_engine.merge_hists(hists, workers=workers, batch_size=4)
+    expected = hists[0].get_hist_array().copy()
+    for hist in hists[1:]:
+        expected.add(hist.get_hist_array())
+    np.testing.assert_array_equal(merged.sumw, expected.sumw)
+    np.testing.assert_array_equal(merged.sumw2, expected.sumw2)
+    np.testing.assert_array_equal(merged.stats, expected.stats)
+    assert merged.entries == expected.entries
+
+
+def test_merge_rejects_empty_and_incompatible_inputs():
+    with pytest.raises(ValueError):
+        merge_engine.merge_hists([])
+    other = th1_tools.TH1DTool("other", "other", 10, -3, 3, backend="numpy")
+    with pytest.raises(ValueError):
+        merge_engine.merge_hists(make_hists(2) + [other], workers=1)
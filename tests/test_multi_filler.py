@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from HEPTools.plot_utils import hist_array, multi_filler, th1_tools
+
+
+def make_columns(num_entries):
+    rng = np.random.default_rng(7)
+    return {
+        "pt": rng.exponential(50.0, num_entries),
+        "eta": rng.normal(0.0, 2.0, num_entries),
+        "weight": rng.random(num_entries),
+    }
+
+
+def assert_same_arrays(array, expected):
+    np.testing.assert_array_equal(array.sumw, expected.sumw)
+    np.testing.assert_array_equal(array.sumw2, expected.sumw2)
+    np.testing.assert_array_equal(array.stats, expected.stats)
+    assert array.entries == expected.entries
+
+
+def test_multi_fill_matches_separate_fills():
+    columns = make_columns(20000)
+    selections = {"all": None, "central": "np.abs(eta) < 1", "high": "pt > 100"}
+    filler = multi_filler.MultiFiller(columns)
+    for name, mask in selections.items():
+        filler.add_hist(
+            th1_tools.TH1DTool(name, name, 40, 0, 400, backend="numpy"),
+            "pt",
+            mask=mask,
+            weight="weight",
+        )
+    filler.add_hist(
+        th1_tools.TH2FTool("pt_eta", "pt_eta", 20, 0, 400, 10, -5, 5, backend="numpy"),
+        ["pt", "eta"],
+    )
+    hists = filler.run()
+    assert filler.get_num_hists() == 0
+    passed = {
+        "all": np.ones(20000, dtype=bool),
+        "central": np.abs(columns["eta"]) < 1,
+        "high": columns["pt"] > 100,
+    }
+    for hist, name in zip(hists, selections):
+        expected = th1_tools.TH1DTool(name, name, 40, 0, 400, backend="numpy")
+        expected.fill_hist(columns["pt"][passed[name]], columns["weight"][passed[name]])
+        assert_same_arrays(hist.get_hist_array(), expected.get_hist_array())
+    expected = th1_tools.TH2FTool(
+        "pt_eta", "pt_eta", 20, 0, 400, 10, -5, 5, backend="numpy"
+    )
+    expected.fill_hist(columns["pt"], columns["eta"])
+    assert_same_arrays(hists[-1].get_hist_array(), expected.get_hist_array())
+
+
+def test_multi_fill_chunks_of_whole_units_match_one_fill():
+    columns = make_columns(3 * hist_array.FILL_UNIT_SIZE + 5)
+    filler = multi_filler.MultiFiller(columns, chunk_size=2 * hist_array.FILL_UNIT_SIZE)
+    hist = filler.add_hist(
+        th1_tools.TH1DTool("pt", "pt", 40, 0, 400, backend="numpy"),
+        "pt",
+        weight="weight",
+    )
+    filler.run()
+    expected = th1_tools.TH1DTool("pt", "pt", 40, 0, 400, backend="numpy")
+    expected.fill_hist(columns["pt"], columns["weight"])
+    assert_same_arrays(hist.get_hist_array(), expected.get_hist_array())
+
+
+def test_add_hist_checks_number_of_variables():
+    filler = multi_filler.MultiFiller(make_columns(10))
+    with pytest.raises(ValueError):
+        filler.add_hist(
+            th1_tools.TH1DTool("pt", "pt", 40, 0, 400, backend="numpy"), ["pt", "eta"]
+        )
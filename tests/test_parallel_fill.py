@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from HEPTools.plot_utils import hist_array, th1_tools
+
+NUM_ENTRIES = 5 * hist_array.FILL_UNIT_SIZE + 123
+
+
+def assert_same_arrays(array, expected):
+    np.testing.assert_array_equal(array.sumw, expected.sumw)
+    np.testing.assert_array_equal(array.sumw2, expected.sumw2)
+    np.testing.assert_array_equal(array.stats, expected.stats)
+    assert array.entries == expected.entries
+
+
+@pytest.mark.parametrize(
+    "fill_kwargs",
+    [
+        {"workers": 3},
+        {"workers": 3, "max_memory": 5000000},
+        {"workers": 2, "chunk_size": 2 * hist_array.FILL_UNIT_SIZE},
+    ],
+)
+def test_parallel_fill_is_identical(fill_kwargs):
+    rng = np.random.default_rng(9)
+    x = rng.normal(0.0, 3.0, NUM_ENTRIES)
+    weights = rng.random(NUM_ENTRIES)
+    hist = th1_tools.TH1DTool("hist", "hist", 50, -5, 5, backend="numpy")
+    hist.fill_hist(x, weights, **fill_kwargs)
+    expected = th1_tools.TH1DTool("hist", "hist", 50, -5, 5, backend="numpy")
+    expected.fill_hist(x, weights)
+    assert_same_arrays(hist.get_hist_array(), expected.get_hist_array())
+
+
+def test_parallel_2d_fill_is_identical():
+    rng = np.random.default_rng(10)
+    x = rng.normal(0.0, 3.0, NUM_ENTRIES)
+    y = rng.random(NUM_ENTRIES)
+    hist = th1_tools.TH2FTool("hist", "hist", 10, -5, 5, 10, 0, 1, backend="numpy")
+    hist.fill_hist(x, y, workers=2, max_memory=4000000)
+    expected = th1_tools.TH2FTool("hist", "hist", 10, -5, 5, 10, 0, 1, backend="numpy")
+    expected.fill_hist(x, y)
+    assert_same_arrays(hist.get_hist_array(), expected.get_hist_array())
@@ -0,0 +1,41 @@
+import pytest
+
+from HEPTools.plot_utils import profiling
+
+
+class FakePlot(object):
+    def __init__(self, name, members=()):
+        self.name = name
+        self.members = list(members)
+
+    @profiling.profiled("draw")
+    def draw(self):
+        for member in self.members:
+            member.draw()
+        with profiling.phase("build_legend", self.name):
+            pass
+
+
+@pytest.fixture
+def recording():
+    profiling.reset()
+    profiling.enable()
+    yield
+    profiling.disable()
+    profiling.reset()
+
+
+def test_nested_phase_with_same_name_is_recorded_once(recording):
+    FakePlot("collection", [FakePlot("first"), FakePlot("second")]).draw()
+    assert profiling._phase_stats[("draw", "collection")].num_calls == 1
+    assert ("draw", "first") not in profiling._phase_stats
+    # other phases nested in the members are still recorded
+    assert profiling._phase_stats[("build_legend", "first")].num_calls == 1
+    FakePlot("first").draw()
+    assert profiling._phase_stats[("draw", "first")].num_calls == 1
+
+
+def test_disabled_profiling_records_nothing():
+    profiling.reset()
+    FakePlot("plot").draw()
+    assert not profiling._phase_stats
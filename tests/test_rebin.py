@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from HEPTools.plot_utils import hist_array, th1_tools
+
+NEW_EDGES = [-2.0, -1.0, 0.0, 0.4, 1.0, 2.0]
+
+
+def make_hist(name="hist"):
+    rng = np.random.default_rng(5)
+    hist = th1_tools.TH1DTool(name, name, 40, -4, 4, backend="numpy")
+    hist.fill_hist(rng.normal(0.0, 1.5, 5000), rng.random(5000))
+    return hist
+
+
+def test_rebin_matches_fill_with_new_edges():
+    hist = make_hist()
+    array = hist.get_hist_array()
+    rebinned = array.rebin(NEW_EDGES)
+    expected = hist_array.HistArray([NEW_EDGES])
+    rng = np.random.default_rng(5)
+    expected.fill(rng.normal(0.0, 1.5, 5000), weights=rng.random(5000))
+    np.testing.assert_array_equal(rebinned.edges[0], NEW_EDGES)
+    np.testing.assert_allclose(rebinned.sumw, expected.sumw)
+    np.testing.assert_allclose(rebinned.sumw2, expected.sumw2)
+    assert rebinned.entries == array.entries
+    assert rebinned.sumw.sum() == pytest.approx(array.sumw.sum())
+
+
+def test_rebin_to_narrower_range_resets_stats():
+    rebinned = make_hist().get_hist_array().rebin(NEW_EDGES)
+    assert rebinned.stats[0] == pytest.approx(rebinned.get_inner().sum())
+
+
+def test_rebin_rejects_misaligned_edges():
+    with pytest.raises(ValueError):
+        make_hist().get_hist_array().rebin([-2.0, 0.05, 2.0])
+
+
+def test_rebin_2d_y_axis():
+    array = hist_array.HistArray.from_uniform([(4, 0.0, 4.0), (6, 0.0, 6.0)])
+    rng = np.random.default_rng(6)
+    array.fill(rng.random(1000) * 4, rng.random(1000) * 6)
+    rebinned = array.rebin([0.0, 2.0, 6.0], axis_id=1)
+    assert rebinned.sumw.shape == (4, 6)
+    np.testing.assert_array_equal(rebinned.sumw.sum(axis=0), array.sumw.sum(axis=0))
+
+
+def test_collection_rebin_updates_binning_attributes():
+    hists = [make_hist("first"), make_hist("second")]
+    collection = th1_tools.HistCollection(hists, copy_hists=False)
+    collection.rebin(NEW_EDGES)
+    for hist in collection.get_hist_list():
+        assert (hist.nbin, hist.xlow, hist.xup) == (5, -2.0, 2.0)
+    # members were views, the inputs keep their binning
+    assert hists[0].nbin == 40
+    assert len(hists[0].get_hist_array().edges[0]) == 41
@@ -0,0 +1,46 @@
+import pytest
+
+from HEPTools.plot_utils import style_config
+
+
+class FakeAxis(object):
+    def __init__(self) -> None:
+        self.title = None
+
+    def SetTitle(self, title: str) -> None:
+        self.title = title
+
+
+class FakeHist(object):
+    default_sumw2 = None
+
+    def __init__(self) -> None:
+        self.color = None
+        self.x_axis = FakeAxis()
+
+    @staticmethod
+    def SetDefaultSumw2(value: bool) -> None:
+        FakeHist.default_sumw2 = value
+
+    def GetXaxis(self) -> FakeAxis:
+        return self.x_axis
+
+    def SetLineColor(self, color: int) -> None:
+        self.color = color
+
+
+def test_apply_member_and_static_setters():
+    hist = FakeHist()
+    config = {
+        "hist": {"SetDefaultSumw2": True, "SetLineColor": 2},
+        "x_axis": {"SetTitle": "x"},
+    }
+    style_config.compile_config(config, hist).apply(hist)
+    assert FakeHist.default_sumw2 is True
+    assert hist.color == 2
+    assert hist.x_axis.title == "x"
+
+
+def test_invalid_setter_raises():
+    with pytest.raises(ValueError):
+        style_config.compile_config({"hist": {"SetNothing": 1}}, FakeHist())
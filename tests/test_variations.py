@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from HEPTools.plot_utils import hist_array, variations
+
+
+def make_array(contents):
+    array = hist_array.HistArray.from_uniform([(len(contents), 0.0, len(contents))])
+    array.sumw[1:-1] = contents
+    array.sumw2[1:-1] = contents
+    return array
+
+
+@pytest.fixture
+def bundle():
+    nominal = make_array([10.0, 20.0, 30.0])
+    return variations.VariationBundle.from_hist_arrays(
+        nominal,
+        {
+            "jes": (make_array([12.0, 21.0, 27.0]), make_array([9.0, 18.0, 33.0])),
+            "lumi": (make_array([11.0, 22.0, 33.0]), None),
+        },
+    )
+
+
+def test_quadrature_sum(bundle):
+    err_down, err_up = bundle.get_quadrature_sum()
+    np.testing.assert_allclose(err_up[1:-1], np.hypot([2.0, 1.0, 3.0], [1.0, 2.0, 3.0]))
+    np.testing.assert_allclose(err_down[1:-1], [1.0, 2.0, 3.0])
+
+
+def test_envelope(bundle):
+    err_down, err_up = bundle.get_envelope()
+    np.testing.assert_allclose(err_up[1:-1], [2.0, 2.0, 3.0])
+    np.testing.assert_allclose(err_down[1:-1], [1.0, 2.0, 3.0])
+
+
+def test_band_spans_nominal_minus_down_to_plus_up(bundle):
+    band = bundle.get_band(method="envelope", include_stat=False)
+    half_width = np.sqrt(band.sumw2[1:-1])
+    np.testing.assert_allclose(band.sumw[1:-1] - half_width, [9.0, 18.0, 27.0])
+    np.testing.assert_allclose(band.sumw[1:-1] + half_width, [12.0, 22.0, 33.0])
+    _, err_up = bundle.get_errors(method="envelope", include_stat=True)
+    np.testing.assert_allclose(
+        err_up[1:-1], np.sqrt([4.0 + 10.0, 4.0 + 20.0, 9.0 + 30.0])
+    )
+
+
+def test_one_sided_and_add(bundle):
+    assert bundle.get_variation("lumi")[1] is None
+    other = variations.VariationBundle(
+        make_array([1.0, 1.0, 1.0]), ["jes"], np.full(5, 2.0), np.zeros(5)
+    )
+    bundle.add(other)
+    assert bundle.names == ["jes", "lumi"]
+    up, down = bundle.get_variation("jes")
+    np.testing.assert_allclose(up.sumw[1:-1], [14.0, 23.0, 29.0])
+    np.testing.assert_allclose(down.sumw[1:-1], [9.0, 18.0, 33.0])
+    lumi_up, _ = bundle.get_variation("lumi")
+    np.testing.assert_allclose(lumi_up.sumw[1:-1], [12.0, 23.0, 34.0])
+    with pytest.raises(ValueError):
+        bundle.get_errors(method="unknown")